@@ -4,5 +4,7 @@ from django.core.asgi import get_asgi_application
 
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "base.settings")
+# settings use this to pick pooled connections over persistent ones
+os.environ.setdefault("DJANGO_ASGI", "true")
 
 application = get_asgi_application()
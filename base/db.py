@@ -0,0 +1,65 @@
+"""Per-process database connection metrics.
+
+Counts Django-level connects per alias (new server connections without a
+pool, checkouts with one) and reads the psycopg pool statistics when pooling
+is enabled. Numbers are per worker process.
+"""
+
+import threading
+from collections import Counter
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_lock = threading.Lock()
+_connects = Counter()
+
+
+@receiver(connection_created)
+def _count_connect(sender, connection, **kwargs):
+    with _lock:
+        _connects[connection.alias] += 1
+
+
+def pool_stats(alias: str = "default"):
+    """Checkouts, waits and overflow of the alias' pool, or None without one."""
+    wrapper = connections[alias]
+    pool = getattr(wrapper, "pool", None)
+    if pool is None:
+        return None
+
+    stats = pool.get_stats()
+    size = stats.get("pool_size", 0)
+    return {
+        "min_size": pool.min_size,
+        "max_size": pool.max_size,
+        "size": size,
+        "available": stats.get("pool_available", 0),
+        "checkouts": stats.get("requests_num", 0),
+        "waits": stats.get("requests_queued", 0),
+        "waiting_now": stats.get("requests_waiting", 0),
+        "wait_ms": stats.get("requests_wait_ms", 0),
+        "timeouts": stats.get("requests_errors", 0),
+        # connections opened above min_size to absorb bursts
+        "overflow": max(0, size - pool.min_size),
+        "connections_opened": stats.get("connections_num", 0),
+        "connection_errors": stats.get("connections_errors", 0),
+    }
+
+
+def connection_stats() -> dict:
+    with _lock:
+        connects = dict(_connects)
+
+    stats = {}
+    for alias in connections:
+        settings_dict = connections.settings[alias]
+        stats[alias] = {
+            "vendor": connections[alias].vendor,
+            "conn_max_age": settings_dict.get("CONN_MAX_AGE", 0),
+            "health_checks": settings_dict.get("CONN_HEALTH_CHECKS", False),
+            "connects": connects.get(alias, 0),
+            "pool": pool_stats(alias),
+        }
+    return stats
@@ -0,0 +1,101 @@
+"""Send reads of opted-in views to the ``replica`` database alias.
+
+Views opt in with ``use_read_replica = True``. For safe requests to such a
+view, ``ReplicaRoutingMiddleware`` routes ORM reads to the replica; writes,
+reads inside a transaction, and sessions always use ``default``. After an
+authenticated write request the session is pinned to the primary for
+``DB_REPLICA_STICKY_SECONDS``, so the redirect that follows a reservation or
+message POST reads its own write.
+
+Anything stored under a version from ``exchange.cache`` (cached values,
+template fragments, page ETags) is read inside ``primary()``: a replica that
+lags the version bump would otherwise store pre-write data under the new
+version for every other visitor.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = "replica"
+STICKY_SESSION_KEY = "_db_primary_until"
+PRIMARY_ONLY_APPS = {"sessions"}
+
+_use_replica = ContextVar("use_read_replica", default=False)
+
+
+def replica_configured() -> bool:
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def primary():
+    """Route reads inside the block to ``default`` even in a replica view."""
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _use_replica.get() or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # the replica receives the schema from the primary
+        if db == REPLICA_DB_ALIAS:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Must come after the session and authentication middleware."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = replica_configured()
+
+    def __call__(self, request):
+        request._replica_token = None
+        try:
+            response = self.get_response(request)
+        finally:
+            if request._replica_token is not None:
+                _use_replica.reset(request._replica_token)
+
+        if self.enabled and request.method not in ("GET", "HEAD", "OPTIONS"):
+            if request.user.is_authenticated:
+                request.session[STICKY_SESSION_KEY] = (
+                    time.time() + settings.DB_REPLICA_STICKY_SECONDS
+                )
+        if settings.DEBUG and request._replica_token is not None:
+            response["X-Database-Route"] = REPLICA_DB_ALIAS
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.enabled or request.method not in ("GET", "HEAD"):
+            return None
+        view = getattr(view_func, "view_class", view_func)
+        if not getattr(view, "use_read_replica", False):
+            return None
+        if request.session.get(STICKY_SESSION_KEY, 0) > time.time():
+            return None
+        request._replica_token = _use_replica.set(True)
+        return None
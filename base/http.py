@@ -0,0 +1,66 @@
+"""Conditional GET and shared caching for pages every anonymous visitor sees alike.
+
+The ETag is built from version counters (see ``exchange.cache``), the active
+language and the release, all read before the view touches the database, so a
+matching ``If-None-Match`` gets a 304 without rendering anything. Responses
+vary on Cookie (session and language cookie) and Accept-Language. Signed-in
+users, and anonymous visitors with a pending flash message, get a private,
+uncached response instead.
+
+Shared responses render from the primary: the body has to be at least as new
+as the versions in its ETag, which a lagging replica can't promise.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.contrib import messages
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.translation import get_language
+
+from base.db_routers import primary
+
+
+class ConditionalGetMixin:
+    def get_version(self) -> tuple:
+        """Values that change whenever the page's data does."""
+        return ()
+
+    def is_shared(self) -> bool:
+        request = self.request
+        return (
+            request.method in ("GET", "HEAD")
+            and not request.user.is_authenticated
+            and not len(messages.get_messages(request))
+        )
+
+    def get_etag(self) -> str:
+        parts = (
+            settings.RELEASE,
+            get_language(),
+            # is_expired and "days left" follow the date, not any write
+            timezone.localdate().isoformat(),
+            *self.get_version(),
+        )
+        digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+        return f'"{digest}"'
+
+    def get(self, request, *args, **kwargs):
+        if not self.is_shared():
+            response = super().get(request, *args, **kwargs)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        etag = self.get_etag()
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            with primary():
+                response = super().get(request, *args, **kwargs)
+                # TemplateResponse renders after the view returns
+                if hasattr(response, "render"):
+                    response.render()
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, max_age=settings.PUBLIC_PAGE_MAX_AGE)
+        patch_vary_headers(response, ("Cookie", "Accept-Language"))
+        return response
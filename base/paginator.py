@@ -0,0 +1,50 @@
+"""A paginator that does not ``COUNT(*)`` huge unfiltered tables.
+
+On PostgreSQL ``COUNT(*)`` reads every visible row, so the admin changelist of
+a table with millions of rows spends most of its time counting. For an
+unfiltered queryset over a table the planner statistics put above
+``threshold`` rows, ``pg_class.reltuples`` is used instead. The estimate is
+refreshed by autovacuum/ANALYZE and is usually within a few percent.
+Filtered querysets, other databases and small tables get the exact count.
+"""
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimated_row_count(queryset):
+    """The planner's row estimate for ``queryset``'s table, or None.
+
+    None unless the queryset is an unfiltered, unsliced, non-distinct read of
+    one table on PostgreSQL whose statistics have been collected.
+    """
+    connection = connections[queryset.db]
+    query = queryset.query
+    if connection.vendor != "postgresql":
+        return None
+    if query.where or query.distinct or query.is_sliced or query.combinator:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+            [connection.ops.quote_name(queryset.model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    # -1 (PostgreSQL 14+) or 0 until the table has been analyzed
+    if row is None or row[0] <= 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    threshold = 100_000
+
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, "query"):
+            estimate = estimated_row_count(self.object_list)
+            if estimate is not None and estimate >= self.threshold:
+                return estimate
+        return super().count
@@ -0,0 +1,36 @@
+"""Object-level access checks that fetch the object once per request.
+
+``test_func`` loads the view's object and keeps it for the rest of dispatch, so
+``get_object()`` in ``get()``, ``post()`` or ``get_context_data()`` does not
+query again. Access is decided on the owner foreign keys' ``*_id`` columns,
+without loading the related users.
+"""
+
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.shortcuts import get_object_or_404
+
+
+class ObjectPermissionMixin(UserPassesTestMixin):
+    """Put after ``LoginRequiredMixin`` and before the generic view."""
+
+    model = None
+    pk_url_kwarg = "pk"
+    # foreign keys to the user model; being any of them grants access
+    owner_fields = ()
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    def get_object(self, queryset=None):
+        if getattr(self, "_object", None) is None:
+            if queryset is None:
+                queryset = self.get_queryset()
+            self._object = get_object_or_404(queryset, pk=self.kwargs[self.pk_url_kwarg])
+        return self._object
+
+    def has_object_permission(self, obj) -> bool:
+        user_id = self.request.user.pk
+        return any(getattr(obj, f"{field}_id") == user_id for field in self.owner_fields)
+
+    def test_func(self):
+        return self.has_object_permission(self.get_object())
@@ -30,6 +30,23 @@ EMAIL_SUBJECT_PREFIX = os.getenv("EMAIL_SUBJECT_PREFIX", "[Exchange Hub] ")
 SERVER_EMAIL = os.getenv("SERVER_EMAIL")  # when sending email to managers and admins
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL")  # when sending email to users
 
+# Connection reuse. By default each worker keeps its connection open for
+# DB_CONN_MAX_AGE seconds. DB_POOL=true switches to a psycopg 3 connection pool
+# instead (`uv sync --extra pool`); Django does not allow both at once, and under
+# ASGI (DJANGO_ASGI is set by base/asgi.py) the pool is the only safe reuse.
+ASGI = os.getenv("DJANGO_ASGI", "False").lower() == "true"
+DB_POOL = os.getenv("DB_POOL", "False").lower() == "true"
+DB_CONN_MAX_AGE = 0 if DB_POOL or ASGI else int(os.getenv("DB_CONN_MAX_AGE", "60"))
+DB_CONN_HEALTH_CHECKS = os.getenv("DB_CONN_HEALTH_CHECKS", "True").lower() == "true"
+
+# A sync gunicorn worker runs at most GUNICORN_THREADS queries at once (one
+# connection per thread), so its pool is fixed at that size. ASGI runs each
+# request's sync code in its own thread, so the pool starts small and grows.
+GUNICORN_THREADS = int(os.getenv("GUNICORN_THREADS", "1"))
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2" if ASGI else str(GUNICORN_THREADS)))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10" if ASGI else str(GUNICORN_THREADS)))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # seconds to wait for a free connection
+
 # Database: https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 DATABASES = {
     "default": {
@@ -39,8 +56,61 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
         "HOST": os.getenv("POSTGRES_HOST", "localhost"),
         "PORT": os.getenv("POSTGRES_PORT", "5432"),
+        "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": DB_CONN_HEALTH_CHECKS,
+        "OPTIONS": (
+            {
+                "pool": {
+                    "min_size": DB_POOL_MIN_SIZE,
+                    "max_size": max(DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE),
+                    "timeout": DB_POOL_TIMEOUT,
+                }
+            }
+            if DB_POOL
+            else {}
+        ),
+    }
+}
+
+# Optional streaming replica; views with use_read_replica = True read from it
+# (see base/db_routers.py). Sessions that just wrote stay on the primary for
+# DB_REPLICA_STICKY_SECONDS so they read their own writes.
+if os.getenv("POSTGRES_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": os.getenv("POSTGRES_REPLICA_DB", DATABASES["default"]["NAME"]),
+        "HOST": os.getenv("POSTGRES_REPLICA_HOST"),
+        "PORT": os.getenv("POSTGRES_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        "OPTIONS": dict(DATABASES["default"]["OPTIONS"]),
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["base.db_routers.ReplicaRouter"]
+DB_REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", "15"))
+
+# Cache shared by all workers: CACHE_BACKEND is redis, memcached, file or locmem
+# (per-process, the default). Redis and memcached need `uv sync --extra redis`
+# or `--extra memcached`; CACHE_LOCATION overrides the default address or path.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem")
+_CACHE_BACKENDS = {
+    "redis": ("django.core.cache.backends.redis.RedisCache", "redis://127.0.0.1:6379/1"),
+    "memcached": ("django.core.cache.backends.memcached.PyMemcacheCache", "127.0.0.1:11211"),
+    "file": ("django.core.cache.backends.filebased.FileBasedCache", "/var/tmp/exchange_hub_cache"),
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "exchange-hub"),
+}
+CACHES = {
+    "default": {
+        "BACKEND": _CACHE_BACKENDS[CACHE_BACKEND][0],
+        "LOCATION": os.getenv("CACHE_LOCATION", _CACHE_BACKENDS[CACHE_BACKEND][1]),
+        "TIMEOUT": int(os.getenv("CACHE_TIMEOUT", "300")),
+        "KEY_PREFIX": os.getenv("CACHE_KEY_PREFIX", "exchange_hub"),
     }
 }
+# locmem and file cull past MAX_ENTRIES (Django's default is 300); every
+# marketplace card is one fragment, so keep room for all of them
+if CACHE_BACKEND in ("locmem", "file"):
+    CACHES["default"]["OPTIONS"] = {
+        "MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "20000")),
+    }
 
 # Local time zone for this installation. Choices can be found here:
 # http://en.wikipedia.org/wiki/List_of_tz_zones_by_name
@@ -91,6 +161,22 @@ STATIC_ROOT = os.getenv("STATIC_ROOT")
 # Example: "http://media.lawrence.com/static/"
 STATIC_URL = "static/"
 
+# Collected files get content-hashed names plus .gz/.br siblings (base.storage).
+# Without STATIC_ROOT nothing is collected, so the plain storage is used.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "base.storage.CompressedManifestStaticFilesStorage"
+        if STATIC_ROOT
+        else "django.contrib.staticfiles.storage.StaticFilesStorage"
+    },
+}
+
+# Serve STATIC_ROOT from the app (base.static) when there is no nginx in front.
+SERVE_STATIC = os.getenv("SERVE_STATIC", "False").lower() == "true"
+# Cache-Control max-age (seconds) of static files without a content hash.
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", "3600"))
+
 # Additional locations of static files
 STATICFILES_DIRS = (
     # Put strings here, like "/home/html/static" or "C:/www/django/static".
@@ -117,7 +203,6 @@ TEMPLATES = [
         "DIRS": [
             BASE_DIR / "base" / "templates",
         ],
-        "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.debug",
@@ -125,11 +210,23 @@ TEMPLATES = [
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
             ],
+            # Compiled templates are kept in memory in every environment; with
+            # DEBUG the autoreloader still clears them when a template changes.
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
         },
     },
 ]
 
 MIDDLEWARE = (
+    "base.static.StaticFilesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -137,6 +234,7 @@ MIDDLEWARE = (
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "allauth.account.middleware.AccountMiddleware",
+    "base.db_routers.ReplicaRoutingMiddleware",
 )
 
 AUTHENTICATION_BACKENDS = [
@@ -199,6 +297,38 @@ TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_BOT_USERNAME = os.getenv("TELEGRAM_BOT_USERNAME", "")
 TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET", "")
 TELEGRAM_ADMIN_CHAT_ID = os.getenv("TELEGRAM_ADMIN_CHAT_ID", "")
+# Point at a stub Bot API (see the loadtest command) instead of api.telegram.org.
+TELEGRAM_API_BASE_URL = os.getenv("TELEGRAM_API_BASE_URL", "https://api.telegram.org")
+# Threads per process sending notifications after commit; 0 sends inline.
+TELEGRAM_NOTIFY_WORKERS = int(os.getenv("TELEGRAM_NOTIFY_WORKERS", "2"))
+
+# Exchange rates: quoted as units of currency per 1 USD.
+EXCHANGE_BASE_CURRENCY = "USD"
+EXCHANGE_RATES_PROVIDER = os.getenv(
+    "EXCHANGE_RATES_PROVIDER", "exchange.rates.StubRatesProvider"
+)
+EXCHANGE_RATES_FILE = os.getenv("EXCHANGE_RATES_FILE", "")
+EXCHANGE_RATES_TTL = int(os.getenv("EXCHANGE_RATES_TTL", "900"))  # seconds
+EXCHANGE_BANK_SPREAD = os.getenv("EXCHANGE_BANK_SPREAD", "0.03")
+EXCHANGE_TRANSFER_FEE_USD = os.getenv("EXCHANGE_TRANSFER_FEE_USD", "0")
+
+# JSON API (exchange.api): requests per client per window; 0 disables the limit.
+API_RATE_LIMIT = int(os.getenv("API_RATE_LIMIT", "120"))
+API_RATE_WINDOW = int(os.getenv("API_RATE_WINDOW", "60"))  # seconds
+# META key of the header your proxy puts the client address in, e.g.
+# HTTP_X_FORWARDED_FOR; empty uses REMOTE_ADDR.
+API_CLIENT_IP_HEADER = os.getenv("API_CLIENT_IP_HEADER", "")
+
+# Pending luggage reservations older than this are cancelled by sweep_expired,
+# freeing their kg. 0 keeps them pending until the seller acts.
+LUGGAGE_PENDING_HOLD_HOURS = int(os.getenv("LUGGAGE_PENDING_HOLD_HOURS", "48"))
+
+# Deploy identifier (e.g. the git commit). Part of public page ETags, so a
+# deploy with changed templates does not answer 304 for the old HTML.
+RELEASE = os.getenv("RELEASE", "")
+# Cache-Control max-age (seconds) of anonymous public pages, for browsers and
+# any CDN or proxy in front of the app. 0 still allows revalidation with ETags.
+PUBLIC_PAGE_MAX_AGE = int(os.getenv("PUBLIC_PAGE_MAX_AGE", "60"))
 
 
 MFA_SUPPORTED_TYPES = [
@@ -0,0 +1,119 @@
+"""Serve collected static files from the app, for deployments without nginx.
+
+With ``SERVE_STATIC=true`` the files under ``STATIC_ROOT`` are indexed once at
+startup; requests for them are answered before any other middleware runs.
+Fingerprinted names from the staticfiles manifest are cached for a year as
+immutable, other files for ``STATIC_MAX_AGE`` seconds. The ``.br`` / ``.gz``
+siblings written by ``base.storage`` are sent to clients that accept them.
+Run ``collectstatic`` before starting the server: new files are not picked up
+until a restart.
+"""
+
+import mimetypes
+import os
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponse, HttpResponseNotAllowed
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from base.storage import compressed_variants
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+@dataclass
+class StaticFile:
+    path: str
+    content_type: str
+    cache_control: str
+    # encoding -> path, best first
+    variants: dict = field(default_factory=dict)
+
+
+def _file_etag(path: str) -> tuple:
+    stat = os.stat(path)
+    return f'"{int(stat.st_mtime):x}-{stat.st_size:x}"', int(stat.st_mtime), stat.st_size
+
+
+def _accepted_encodings(request) -> set:
+    accepted = set()
+    for part in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        coding, _sep, params = part.strip().partition(";")
+        if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticFilesMiddleware:
+    """Put first in ``MIDDLEWARE``."""
+
+    def __init__(self, get_response):
+        if not settings.SERVE_STATIC or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = "/" + urlsplit(settings.STATIC_URL).path.strip("/") + "/"
+        self.files = self._index(settings.STATIC_ROOT)
+
+    def _index(self, root) -> dict:
+        hashed_names = set(getattr(staticfiles_storage, "hashed_files", {}).values())
+        files = {}
+        for directory, _dirs, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                relative = os.path.relpath(path, root).replace(os.sep, "/")
+                if relative.endswith((".gz", ".br")) and os.path.exists(path[:-3]):
+                    continue
+                content_type, encoding = mimetypes.guess_type(path)
+                if encoding:
+                    # e.g. a .tar.gz download: send as is, not as a gzip variant
+                    content_type = "application/octet-stream"
+                if relative in hashed_names:
+                    cache_control = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+                else:
+                    cache_control = f"public, max-age={settings.STATIC_MAX_AGE}"
+                files[self.prefix + relative] = StaticFile(
+                    path=path,
+                    content_type=content_type or "application/octet-stream",
+                    cache_control=cache_control,
+                    variants=compressed_variants(path),
+                )
+        return files
+
+    def __call__(self, request):
+        static_file = self.files.get(request.path_info)
+        if static_file is None:
+            return self.get_response(request)
+        if request.method not in ("GET", "HEAD"):
+            return HttpResponseNotAllowed(["GET", "HEAD"])
+
+        path, encoding = static_file.path, None
+        if static_file.variants:
+            accepted = _accepted_encodings(request)
+            for candidate, variant_path in static_file.variants.items():
+                if candidate in accepted:
+                    path, encoding = variant_path, candidate
+                    break
+
+        etag, mtime, size = _file_etag(path)
+        response = get_conditional_response(request, etag=etag, last_modified=mtime)
+        if response is None:
+            if request.method == "HEAD":
+                response = HttpResponse(content_type=static_file.content_type)
+            else:
+                response = FileResponse(open(path, "rb"), content_type=static_file.content_type)
+                # FileResponse names the (variant) file; not wanted for assets
+                del response["Content-Disposition"]
+            response["Content-Length"] = size
+            if encoding:
+                response["Content-Encoding"] = encoding
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(mtime)
+        response["Cache-Control"] = static_file.cache_control
+        if static_file.variants:
+            patch_vary_headers(response, ("Accept-Encoding",))
+        return response
@@ -0,0 +1,77 @@
+"""Fingerprinted static files with pre-compressed siblings.
+
+``collectstatic`` writes every file under a content-hashed name (via
+``ManifestStaticFilesStorage``) and, next to each compressible one, a ``.gz``
+and, when the optional ``brotli`` package is installed, a ``.br`` variant.
+``base.static.StaticFilesMiddleware`` (or nginx with ``gzip_static`` /
+``brotli_static``) serves the variants without compressing per request.
+"""
+
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # optional: pip install "exchange-hub[brotli]"
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {
+    ".css",
+    ".html",
+    ".ico",
+    ".js",
+    ".json",
+    ".map",
+    ".svg",
+    ".txt",
+    ".xml",
+}
+# below this, headers outweigh what compression saves
+MIN_COMPRESS_SIZE = 256
+
+
+def compressed_variants(path):
+    """``{encoding: sibling path}`` of the variants found next to ``path``."""
+    variants = {}
+    for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+        if os.path.exists(path + suffix):
+            variants[encoding] = path + suffix
+    return variants
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            for compressed_name in self._compress(name):
+                yield name, compressed_name, True
+
+    def _compress(self, name):
+        path = self.path(name)
+        # unhashed names are rewritten in place, so drop variants of the old content
+        for suffix in (".gz", ".br"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+
+        variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append((".br", brotli.compress(data)))
+        for suffix, compressed in variants:
+            # keep a variant only when it saves at least 5%
+            if len(compressed) < len(data) * 0.95:
+                with open(path + suffix, "wb") as f:
+                    f.write(compressed)
+                yield name + suffix
@@ -5,7 +5,7 @@ from django.urls import include, path
 from django.views.generic.base import TemplateView
 
 from allauth.account.decorators import secure_admin_login
-from .views import FAQView, IndexView
+from .views import CacheMetricsView, DatabaseMetricsView, FAQView, IndexView, SwitchLanguageView
 
 admin.autodiscover()
 admin.site.login = secure_admin_login(admin.site.login)
@@ -13,9 +13,12 @@ admin.site.login = secure_admin_login(admin.site.login)
 urlpatterns = [
     path("", IndexView.as_view(), name="home"),
     path("faq/", FAQView.as_view(), name="faq"),
+    path("metrics/db/", DatabaseMetricsView.as_view(), name="db_metrics"),
+    path("metrics/cache/", CacheMetricsView.as_view(), name="cache_metrics"),
     path("accounts/", include("allauth.urls")),
     path("accounts/profile/", TemplateView.as_view(template_name="profile.html")),
     path("admin/", admin.site.urls),
+    path("i18n/switch/<str:language>/", SwitchLanguageView.as_view(), name="switch_language"),
     path("i18n/", include("django.conf.urls.i18n")),
     path("exchange/", include("exchange.urls")),
 ]
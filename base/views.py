@@ -1,9 +1,28 @@
-from django.views.generic.base import TemplateView
-from exchange.models import LuggageListing, Message, Request
+from django.conf import settings
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.http import Http404, HttpResponseRedirect, JsonResponse
+from django.urls import translate_url
+from django.utils.cache import add_never_cache_headers
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.generic.base import TemplateView, View
 
+from base.db import connection_stats
+from base.http import ConditionalGetMixin
+from exchange import cache, rates
+from exchange.models import LuggageListing, Request
 
-class IndexView(TemplateView):
+
+class IndexView(ConditionalGetMixin, TemplateView):
     template_name = "index.html"
+    use_read_replica = True
+
+    def get_version(self):
+        return (
+            cache.version(cache.OFFERS, cache.ALL),
+            cache.version(cache.LISTINGS, cache.ALL),
+            # potential savings follow the exchange rates
+            sorted(rates.latest_rates().items()),
+        )
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
@@ -11,37 +30,84 @@ class IndexView(TemplateView):
             {
                 "send_requests": Request.objects.filter(
                     type="send", status="active"
-                ).order_by("-created_at"),
+                )
+                .with_potential_savings()
+                .order_by("-created_at"),
                 "receive_requests": Request.objects.filter(
                     type="receive", status="active"
-                ).order_by("-created_at"),
+                )
+                .with_potential_savings()
+                .order_by("-created_at"),
                 "recent_luggage_listings": LuggageListing.objects.filter(
                     is_active=True
                 )
                 .select_related("seller")
+                .with_capacity()
                 .order_by("-created_at")[:3],
-                "unread_messages": (
-                    Message.get_unread_message_count_by_user(self.request.user)
-                    if self.request.user.is_authenticated
-                    else 0
-                ),
+                "unread_messages": cache.unread_count(self.request.user),
             }
         )
         return ctx
 
 
-class FAQView(TemplateView):
+class FAQView(ConditionalGetMixin, TemplateView):
     template_name = "faq.html"
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
         ctx.update(
             {
-                "unread_messages": (
-                    Message.get_unread_message_count_by_user(self.request.user)
-                    if self.request.user.is_authenticated
-                    else 0
-                ),
+                "unread_messages": cache.unread_count(self.request.user),
             }
         )
         return ctx
+
+
+class SwitchLanguageView(View):
+    """Set the language cookie and go back to ``next``.
+
+    The switcher links here instead of posting to ``set_language``, which
+    would need a per-visitor CSRF token in every page and keep shared caches
+    from storing them.
+    """
+
+    def get(self, request, language):
+        if language not in dict(settings.LANGUAGES):
+            raise Http404
+        next_url = request.GET.get("next")
+        if not url_has_allowed_host_and_scheme(
+            next_url, allowed_hosts={request.get_host()}, require_https=request.is_secure()
+        ):
+            next_url = "/"
+        response = HttpResponseRedirect(translate_url(next_url, language))
+        response.set_cookie(
+            settings.LANGUAGE_COOKIE_NAME,
+            language,
+            max_age=settings.LANGUAGE_COOKIE_AGE,
+            path=settings.LANGUAGE_COOKIE_PATH,
+            domain=settings.LANGUAGE_COOKIE_DOMAIN,
+            secure=settings.LANGUAGE_COOKIE_SECURE,
+            httponly=settings.LANGUAGE_COOKIE_HTTPONLY,
+            samesite=settings.LANGUAGE_COOKIE_SAMESITE,
+        )
+        add_never_cache_headers(response)
+        return response
+
+
+class DatabaseMetricsView(UserPassesTestMixin, View):
+    """Connection and pool counters of the worker process serving the request."""
+
+    raise_exception = True
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({"databases": connection_stats()})
+
+
+class CacheMetricsView(DatabaseMetricsView):
+    """Hit and miss counters of ``exchange.cache`` in the serving worker process."""
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({"cache": cache.stats()})
@@ -1,46 +1,137 @@
 from django.contrib import admin
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.translation import gettext_lazy as _
+from base.paginator import EstimatedCountPaginator
+from exchange.exports import export_response
 from exchange.models import (
     Conversation,
+    ConversationMembership,
     Message,
     Request,
     LuggageListing,
     LuggageReservation,
     LuggageTelegramSubscription,
-    TelegramLinkToken,
+    LuggageWaitlistEntry,
+    ExchangeRate,
 )
 
 
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist settings for tables that grow without bound.
+
+    The unfiltered changelist uses the planner's row estimate instead of
+    COUNT(*), and the second "N total" count is skipped.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class RecentMessagesFormSet(BaseInlineFormSet):
+    def get_queryset(self):
+        # newest first, so the cap keeps the latest messages
+        if not hasattr(self, "_recent"):
+            self._recent = (
+                super().get_queryset().select_related("sender").order_by("-timestamp")[
+                    : MessageInline.max_shown
+                ]
+            )
+        return self._recent
+
+
 class MessageInline(admin.TabularInline):
     model = Message
+    formset = RecentMessagesFormSet
     extra = 0
-    
+    max_shown = 50
+    verbose_name_plural = _("Latest messages")
+    autocomplete_fields = ["sender"]
+
     def has_change_permission(self, request, obj = ...):
         return False
 
+class ConversationMembershipInline(admin.TabularInline):
+    model = ConversationMembership
+    extra = 0
+    readonly_fields = ["user", "last_read_message_id", "last_read_at"]
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
 # Register your models here.
 @admin.register(Conversation)
-class ConversationAdmin(admin.ModelAdmin):
+class ConversationAdmin(LargeTableAdmin):
     list_display = ["request", "participant1", "participant2"]
-    inlines = [MessageInline]
+    list_select_related = ["request__user", "participant1", "participant2"]
+    search_fields = ["participant1__username", "participant2__username"]
+    autocomplete_fields = ["request", "participant1", "participant2"]
+    readonly_fields = ["all_messages"]
+    inlines = [ConversationMembershipInline, MessageInline]
+
+    @admin.display(description=_("Messages"))
+    def all_messages(self, obj):
+        if obj.pk is None:
+            return "-"
+        url = reverse("admin:exchange_message_changelist")
+        return format_html(
+            '<a href="{}?conversation__exact={}">{}</a>',
+            url,
+            obj.pk,
+            _("All %(count)s messages") % {"count": obj.messages.count()},
+        )
 
 @admin.register(Message)
-class MessageAdmin(admin.ModelAdmin):
+class MessageAdmin(LargeTableAdmin):
     list_display = ["conversation", "sender", "content", "timestamp"]
+    list_select_related = [
+        "conversation__request__user",
+        "conversation__participant1",
+        "conversation__participant2",
+        "sender",
+    ]
+    autocomplete_fields = ["conversation", "sender"]
     def has_change_permission(self, request, obj = ...):
         return False
 
 
+@admin.action(description=_("Export selected as CSV"))
+def export_csv(modeladmin, request, queryset):
+    return export_response(queryset, "csv")
+
+
+@admin.action(description=_("Export selected as JSON Lines"))
+def export_jsonl(modeladmin, request, queryset):
+    return export_response(queryset, "jsonl")
+
+
 @admin.register(Request)
-class RequestAdmin(admin.ModelAdmin):
+class RequestAdmin(LargeTableAdmin):
     list_display = ["user", "type", "amount_with_currency", "status"]
-    list_filter = ["type", "status"]
+    list_filter = ["type", "status", "created_at"]
+    list_select_related = ["user"]
+    search_fields = ["user__username", "conditions"]
+    autocomplete_fields = ["user"]
+    actions = [export_csv, export_jsonl]
 
 
 @admin.register(LuggageReservation)
-class LuggageReservationAdmin(admin.ModelAdmin):
+class LuggageReservationAdmin(LargeTableAdmin):
     list_display = ["listing", "buyer", "kg_requested", "status", "created_at"]
     list_filter = ["status", "created_at"]
+    list_select_related = ["listing__seller", "buyer"]
     search_fields = ["buyer__username", "listing__title", "contact_handle"]
+    autocomplete_fields = ["listing", "buyer"]
+    actions = [export_csv, export_jsonl]
+
+
+@admin.register(LuggageWaitlistEntry)
+class LuggageWaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ["listing", "buyer", "kg_requested", "created_at"]
+    list_select_related = ["listing__seller", "buyer"]
+    search_fields = ["buyer__username", "listing__title"]
+    autocomplete_fields = ["listing", "buyer"]
 
 
 @admin.register(LuggageListing)
@@ -49,23 +140,42 @@ class LuggageListingAdmin(admin.ModelAdmin):
         "title",
         "seller",
         "total_kg",
+        "committed_kg",
+        "remaining_kg",
         "price_per_kg",
         "available_until",
         "is_active",
     ]
-    list_filter = ["is_active", "available_until"]
+    list_filter = ["is_active", "available_until", "created_at"]
+    list_select_related = ["seller"]
     search_fields = ["title", "seller__username", "pickup_location_tokyo"]
+    autocomplete_fields = ["seller"]
+    actions = [export_csv, export_jsonl]
+
+    def get_queryset(self, request):
+        # one aggregate for the page instead of two per row
+        return super().get_queryset(request).with_capacity()
+
+    @admin.display(description=_("Committed kg"), ordering="committed_kg_total")
+    def committed_kg(self, obj):
+        return obj.committed_kg
+
+    @admin.display(description=_("Remaining kg"))
+    def remaining_kg(self, obj):
+        return obj.remaining_kg
 
 
 @admin.register(LuggageTelegramSubscription)
 class LuggageTelegramSubscriptionAdmin(admin.ModelAdmin):
     list_display = ["user", "listing", "is_active", "updated_at"]
     list_filter = ["is_active", "notify_on_sold_out", "notify_on_new_reservation"]
+    list_select_related = ["user", "listing__seller"]
     search_fields = ["user__username", "listing__title"]
+    autocomplete_fields = ["user", "listing"]
 
 
-@admin.register(TelegramLinkToken)
-class TelegramLinkTokenAdmin(admin.ModelAdmin):
-    list_display = ["user", "token", "expires_at", "used_at"]
-    list_filter = ["created_at", "expires_at", "used_at"]
-    search_fields = ["user__username", "token"]
\ No newline at end of file
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ["currency", "rate", "source", "fetched_at"]
+    list_filter = ["currency", "source"]
+    date_hierarchy = "fetched_at"
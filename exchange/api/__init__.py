@@ -0,0 +1,7 @@
+"""Read-only JSON API for luggage listings and money offers.
+
+Rows are serialized straight from ``values()`` dicts, paginated with keyset
+cursors over ``(created_at, id)`` and trimmed with ``?fields=``. Responses
+carry an ETag (and Last-Modified where the data has a modification time), and
+every client is rate limited through the shared cache.
+"""
@@ -0,0 +1,52 @@
+"""Fixed-window request counting per API client in the shared cache.
+
+Clients are signed-in users by id and everyone else by IP address. The counter
+lives in the default cache, so the limit holds across workers when that cache
+is shared (Redis or Memcached).
+"""
+
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+@dataclass
+class RateLimit:
+    limit: int
+    remaining: int
+    reset_in: int
+
+    @property
+    def exceeded(self) -> bool:
+        return self.remaining < 0
+
+
+def client_id(request) -> str:
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    ip = request.META.get("REMOTE_ADDR", "")
+    if settings.API_CLIENT_IP_HEADER:
+        # the proxy appends the address it saw last
+        forwarded = request.META.get(settings.API_CLIENT_IP_HEADER, "")
+        ip = forwarded.rsplit(",", 1)[-1].strip() or ip
+    return f"ip:{ip}"
+
+
+def hit(request) -> RateLimit | None:
+    """Count the request; None when rate limiting is off."""
+    limit, window = settings.API_RATE_LIMIT, settings.API_RATE_WINDOW
+    if not limit:
+        return None
+
+    now = time.time()
+    key = f"api-rate:{client_id(request)}:{int(now // window)}"
+    cache.add(key, 0, timeout=window + 1)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # evicted between add() and incr()
+        cache.set(key, 1, timeout=window + 1)
+        count = 1
+    return RateLimit(limit=limit, remaining=limit - count, reset_in=int(window - now % window) + 1)
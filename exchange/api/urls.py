@@ -0,0 +1,15 @@
+from django.urls import path
+
+from exchange.api import views
+
+urlpatterns = [
+    path("listings/", views.ListingListView.as_view(), name="api_listings"),
+    path("listings/<uuid:listing_id>/", views.ListingDetailView.as_view(), name="api_listing"),
+    path(
+        "listings/<uuid:listing_id>/capacity/",
+        views.ListingCapacityView.as_view(),
+        name="api_listing_capacity",
+    ),
+    path("offers/", views.OfferListView.as_view(), name="api_offers"),
+    path("offers/<uuid:request_id>/", views.OfferDetailView.as_view(), name="api_offer"),
+]
@@ -0,0 +1,248 @@
+import hashlib
+import json
+from decimal import Decimal
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import F, Max, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, urlencode
+from django.views.generic import View
+
+from exchange.api import throttling
+from exchange.api.pagination import InvalidCursor, encode_cursor, paginate
+from exchange.models import LuggageListing, Request
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+_kg = models.DecimalField(max_digits=12, decimal_places=2)
+
+# public field name -> None for the model field of that name, or an expression
+LISTING_FIELDS = {
+    "id": None,
+    "title": None,
+    "seller": F("seller__username"),
+    "departure_city": None,
+    "arrival_city": None,
+    "available_until": None,
+    "arrival_datetime": None,
+    "pickup_location_tokyo": None,
+    "delivery_options": None,
+    "allowed_items": None,
+    "prohibited_items": None,
+    "description": None,
+    "price_per_kg": None,
+    "price_currency": None,
+    "price_per_kg_base": None,
+    "is_active": None,
+    "total_kg": None,
+    "committed_kg": F("committed_kg_total"),
+    "reserved_kg": F("reserved_kg_total"),
+    "remaining_kg": Greatest(
+        F("total_kg") - F("committed_kg_total"), Value(Decimal("0")), output_field=_kg
+    ),
+    "created_at": None,
+    "updated_at": None,
+}
+CAPACITY_FIELDS = ["id", "total_kg", "committed_kg", "reserved_kg", "remaining_kg"]
+
+OFFER_FIELDS = {
+    "id": None,
+    "type": None,
+    "amount": None,
+    "currency": None,
+    "deadline": None,
+    "urgent": None,
+    "conditions": None,
+    "status": None,
+    "user": F("user__username"),
+    "created_at": None,
+}
+
+
+def _wants_capacity(names) -> bool:
+    return bool({"committed_kg", "reserved_kg", "remaining_kg"} & set(names))
+
+
+def listings(names):
+    """Listings, with the capacity totals only when ``names`` asks for them."""
+    queryset = LuggageListing.objects.all()
+    return queryset.with_capacity() if _wants_capacity(names) else queryset
+
+
+class ApiError(Exception):
+    def __init__(self, detail: str, status: int = 400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status = status
+
+
+class ApiView(View):
+    """Rate limiting, JSON errors, sparse fieldsets and conditional responses."""
+
+    http_method_names = ["get", "head", "options"]
+    use_read_replica = True
+    fields = {}
+    # fetched even when not selected: cursor keys, and last_modified on details
+    extra_fields = ["id", "created_at"]
+
+    def dispatch(self, request, *args, **kwargs):
+        rate = throttling.hit(request)
+        if rate is not None and rate.exceeded:
+            response = JsonResponse({"detail": "Rate limit exceeded."}, status=429)
+            response["Retry-After"] = rate.reset_in
+        else:
+            try:
+                response = super().dispatch(request, *args, **kwargs)
+            except ApiError as exc:
+                response = JsonResponse({"detail": exc.detail}, status=exc.status)
+        if rate is not None:
+            response["X-RateLimit-Limit"] = rate.limit
+            response["X-RateLimit-Remaining"] = max(rate.remaining, 0)
+            response["X-RateLimit-Reset"] = rate.reset_in
+        return response
+
+    def selected_fields(self) -> list:
+        requested = self.request.GET.get("fields")
+        if not requested:
+            return list(self.fields)
+        names = list(dict.fromkeys(name.strip() for name in requested.split(",") if name.strip()))
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(f"Unknown fields: {', '.join(unknown)}.")
+        return names
+
+    def get_queryset(self, names):
+        raise NotImplementedError
+
+    def column(self, name) -> str:
+        # expressions get a prefix, as "seller" would clash with the seller FK
+        return name if self.fields[name] is None else f"api_{name}"
+
+    def get_rows(self, names):
+        """``values()`` over the selected fields plus ``extra_fields``."""
+        plain = [name for name in names if self.fields[name] is None]
+        plain += [name for name in self.extra_fields if name not in names]
+        expressions = {
+            self.column(name): self.fields[name]
+            for name in names
+            if self.fields[name] is not None
+        }
+        return self.get_queryset(names).values(*plain, **expressions)
+
+    def project(self, row, names) -> dict:
+        return {name: row[self.column(name)] for name in names}
+
+    def render(self, payload, last_modified=None):
+        """JSON with an ETag over the body; a 304 when the client's copy is current."""
+        body = json.dumps(payload, cls=DjangoJSONEncoder, separators=(",", ":")).encode()
+        etag = f'"{hashlib.md5(body, usedforsecurity=False).hexdigest()}"'
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(
+            self.request, etag=etag, last_modified=timestamp
+        ) or HttpResponse(body, content_type="application/json")
+        response["ETag"] = etag
+        if timestamp is not None:
+            response["Last-Modified"] = http_date(timestamp)
+        return response
+
+
+class ApiListView(ApiView):
+    def get_limit(self) -> int:
+        try:
+            limit = int(self.request.GET.get("limit", PAGE_SIZE))
+        except ValueError:
+            raise ApiError("limit must be an integer.")
+        return max(1, min(limit, MAX_PAGE_SIZE))
+
+    def get(self, request, *args, **kwargs):
+        names = self.selected_fields()
+        try:
+            rows, has_more = paginate(
+                self.get_rows(names), request.GET.get("cursor"), self.get_limit()
+            )
+        except InvalidCursor as exc:
+            raise ApiError(str(exc))
+
+        next_url = None
+        if has_more:
+            params = request.GET.copy()
+            params["cursor"] = encode_cursor(rows[-1])
+            next_url = request.build_absolute_uri(f"{request.path}?{urlencode(params, doseq=True)}")
+
+        # ETag only: a page's newest modification time can go back when a row
+        # leaves the page, so Last-Modified could wrongly validate a stale copy
+        results = [self.project(row, names) for row in rows]
+        return self.render({"results": results, "next": next_url})
+
+
+class ApiDetailView(ApiView):
+    lookup_url_kwarg = "pk"
+
+    def get(self, request, *args, **kwargs):
+        names = self.selected_fields()
+        row = self.get_rows(names).filter(id=kwargs[self.lookup_url_kwarg]).first()
+        if row is None:
+            raise ApiError("Not found.", status=404)
+        return self.render(self.project(row, names), row.get("last_modified"))
+
+
+class ListingListView(ApiListView):
+    """Active listings, newest first; filter with ``departure_city`` / ``arrival_city``."""
+
+    fields = LISTING_FIELDS
+
+    def get_queryset(self, names):
+        queryset = listings(names).filter(is_active=True)
+        for param in ("departure_city", "arrival_city"):
+            if value := self.request.GET.get(param):
+                queryset = queryset.filter(**{f"{param}__iexact": value})
+        return queryset
+
+
+class ListingDetailView(ApiDetailView):
+    fields = LISTING_FIELDS
+    extra_fields = ["id", "last_modified"]
+    lookup_url_kwarg = "listing_id"
+
+    def get_queryset(self, names):
+        if not _wants_capacity(names):
+            return listings(names).annotate(last_modified=F("updated_at"))
+        # capacity figures change with the reservations, so they count too
+        return listings(names).annotate(
+            last_modified=Greatest(
+                "updated_at", Coalesce(Max("reservations__updated_at"), "updated_at")
+            )
+        )
+
+
+class ListingCapacityView(ListingDetailView):
+    fields = {name: LISTING_FIELDS[name] for name in CAPACITY_FIELDS}
+
+
+class OfferListView(ApiListView):
+    """Active offers, newest first; filter with ``type=send|receive``."""
+
+    fields = OFFER_FIELDS
+
+    def get_queryset(self, names):
+        queryset = Request.objects.filter(status="active")
+        offer_type = self.request.GET.get("type")
+        if offer_type:
+            if offer_type not in dict(Request.TYPE_CHOICES):
+                raise ApiError("type must be send or receive.")
+            queryset = queryset.filter(type=offer_type)
+        return queryset
+
+
+class OfferDetailView(ApiDetailView):
+    fields = OFFER_FIELDS
+    extra_fields = ["id"]
+    lookup_url_kwarg = "request_id"
+
+    def get_queryset(self, names):
+        return Request.objects.all()
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ExchangeConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "exchange"
+
+    def ready(self):
+        # connect the per-process connection counters behind /metrics/db/
+        import base.db  # noqa: F401
+        # version bumps for exchange.cache
+        import exchange.signals  # noqa: F401
+        import exchange.checks  # noqa: F401
@@ -0,0 +1,214 @@
+import json
+import math
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+from urllib import request
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.http import HttpRequest
+from django.middleware.csrf import get_token
+from django.utils import timezone
+
+from exchange.models import (
+    Conversation,
+    LuggageListing,
+    LuggageTelegramSubscription,
+    Message,
+    Request,
+)
+
+BENCH_PASSWORD = "bench-password-123"
+# note on the reservations benchmark runs create, so they can be cleaned up
+BENCHMARK_NOTE = "benchmark"
+
+
+@dataclass
+class Fixtures:
+    seller: object
+    buyer: object
+    listing: LuggageListing
+    conversation: Conversation
+
+
+def ensure_fixtures() -> Fixtures:
+    """Idempotently create the fixed users/objects benchmarks and load tests act on."""
+    User = get_user_model()
+
+    seller, created = User.objects.get_or_create(
+        username="bench_seller", defaults={"email": "bench_seller@example.com"}
+    )
+    if created:
+        seller.set_password(BENCH_PASSWORD)
+        seller.save(update_fields=["password"])
+
+    buyer, created = User.objects.get_or_create(
+        username="bench_buyer",
+        defaults={
+            "email": "bench_buyer@example.com",
+            "telegram_chat_id": "-1000000000001",
+            "telegram_notifications_enabled": True,
+            "telegram_linked_at": timezone.now(),
+        },
+    )
+    if created:
+        buyer.set_password(BENCH_PASSWORD)
+        buyer.save(update_fields=["password"])
+
+    listing, _ = LuggageListing.objects.get_or_create(
+        seller=seller,
+        title="Benchmark listing",
+        defaults={
+            "total_kg": Decimal("9999"),
+            "price_per_kg": Decimal("1500"),
+            "price_currency": "JPY",
+            "available_until": timezone.localdate() + timedelta(days=3650),
+            "pickup_location_tokyo": "Shinjuku",
+            "allowed_items": "Clothes",
+            "prohibited_items": "Liquids",
+        },
+    )
+
+    offer, _ = Request.objects.get_or_create(
+        user=seller,
+        conditions="Benchmark offer",
+        defaults={
+            "type": "send",
+            "amount": Decimal("100000"),
+            "currency": "JPY",
+            "deadline": timezone.now() + timedelta(days=3650),
+        },
+    )
+    conversation, created = Conversation.get_or_start(offer, buyer.pk, seller.pk)
+    if created:
+        Message.objects.bulk_create(
+            Message(
+                conversation=conversation,
+                sender=buyer if i % 2 else seller,
+                content=f"Benchmark message {i}",
+            )
+            for i in range(50)
+        )
+
+    return Fixtures(seller=seller, buyer=buyer, listing=listing, conversation=conversation)
+
+
+SELLER_CHAT_ID = "-1000000000002"
+
+
+def ensure_load_users(fixtures: Fixtures, count: int) -> list:
+    """``count`` Telegram-linked buyers, each with a conversation with the bench seller.
+
+    Also links the bench seller to Telegram and subscribes them to the bench
+    listing, so every reservation produces a notification to measure.
+    """
+    User = get_user_model()
+
+    seller = fixtures.seller
+    if seller.telegram_chat_id != SELLER_CHAT_ID:
+        User.objects.filter(telegram_chat_id=SELLER_CHAT_ID).exclude(pk=seller.pk).update(
+            telegram_chat_id=None
+        )
+        seller.link_telegram(SELLER_CHAT_ID, "bench_seller")
+        seller.save()
+    LuggageTelegramSubscription.objects.update_or_create(
+        user=seller,
+        listing=fixtures.listing,
+        defaults={"is_active": True, "notify_on_new_reservation": True},
+    )
+
+    users = []
+    for index in range(count):
+        user, created = User.objects.get_or_create(
+            username=f"load_user_{index}",
+            defaults={
+                "email": f"load_user_{index}@example.com",
+                "telegram_chat_id": f"-2000000{index:06d}",
+                "telegram_notifications_enabled": True,
+                "telegram_linked_at": timezone.now(),
+            },
+        )
+        if created:
+            user.set_password(BENCH_PASSWORD)
+            user.save(update_fields=["password"])
+        conversation, _ = Conversation.get_or_start(
+            fixtures.conversation.request, user.pk, seller.pk
+        )
+        users.append((user, conversation))
+    return users
+
+
+def session_cookies(user) -> dict:
+    """Cookies for a logged-in session plus a CSRF token, usable from any HTTP client."""
+    session = SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = "django.contrib.auth.backends.ModelBackend"
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.create()
+    return {
+        settings.SESSION_COOKIE_NAME: session.session_key,
+        settings.CSRF_COOKIE_NAME: get_token(HttpRequest()),
+    }
+
+
+class _NoRedirectHandler(request.HTTPRedirectHandler):
+    # report the 302 itself, like the Django test client does
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+_opener = request.build_opener(_NoRedirectHandler)
+
+
+def http_call(base_url: str, method: str, path: str, cookies=None, data=None, headers=None, timeout=30):
+    """Minimal urllib client; returns the HTTP status code (errors included)."""
+    headers = dict(headers or {})
+    cookies = cookies or {}
+    if cookies:
+        headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in cookies.items())
+        if method != "GET" and settings.CSRF_COOKIE_NAME in cookies:
+            headers["X-CSRFToken"] = cookies[settings.CSRF_COOKIE_NAME]
+            headers.setdefault("Referer", base_url + path)
+
+    body = None
+    if data is not None:
+        if isinstance(data, (bytes, str)):
+            body = data.encode() if isinstance(data, str) else data
+        else:
+            body = urlencode(data).encode()
+            headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+
+    req = request.Request(base_url + path, data=body, headers=headers, method=method)
+    try:
+        with _opener.open(req, timeout=timeout) as resp:
+            resp.read()
+            return resp.status
+    except HTTPError as exc:
+        return exc.code
+
+
+def webhook_payload(chat_id: str, text: str) -> bytes:
+    return json.dumps(
+        {
+            "update_id": 1,
+            "message": {
+                "message_id": 1,
+                "text": text,
+                "chat": {"id": chat_id, "type": "private"},
+                "from": {"id": chat_id, "username": "bench"},
+            },
+        }
+    ).encode()
+
+
+def percentile(samples: list, fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[index]
@@ -0,0 +1,142 @@
+"""Cache-aside reads for hot objects, keyed by per-object versions.
+
+A value lives under ``<kind>:<id>:v<version>``. Writers never delete entries,
+they ``bump()`` the version so every worker sharing the cache misses on its
+next read and the stale entry just expires. Model signals bump on save and
+delete (see ``exchange.signals``); code that writes through
+``QuerySet.update()`` bumps explicitly.
+
+``LISTINGS`` and ``OFFERS`` are site-wide versions (ident ``ALL``) for pages
+that list many objects; every listing or capacity bump also bumps
+``LISTINGS``. They only feed page ETags and cache no values themselves.
+
+Loaders always read the primary, see ``base.db_routers``.
+
+Hit and miss counters are per process and served to staff at /metrics/cache/.
+"""
+
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+
+from base.db_routers import primary
+from exchange.models import LuggageListing, Message
+
+LISTING = "listing"
+CAPACITY = "capacity"
+UNREAD = "unread"
+LISTINGS = "listings"
+OFFERS = "offers"
+ALL = "all"
+
+TIMEOUTS = {
+    LISTING: 300,
+    CAPACITY: 300,
+    UNREAD: 60,
+}
+
+_MISSING = object()
+_lock = threading.Lock()
+_hits = Counter()
+_misses = Counter()
+
+
+def _version_key(kind: str, ident) -> str:
+    return f"ver:{kind}:{ident}"
+
+
+def version(kind: str, ident) -> int:
+    key = _version_key(kind, ident)
+    current = cache.get(key)
+    if current is None:
+        # Start from the clock rather than 1: if the counter was evicted, the
+        # new version is still newer than any entry cached under the old one.
+        current = time.time_ns() // 1000
+        if not cache.add(key, current, timeout=None):
+            current = cache.get(key, current)
+    return current
+
+
+def bump(kind: str, *idents):
+    """Invalidate once the surrounding transaction (if any) commits.
+
+    Bumping earlier would let a concurrent read cache the pre-commit row under
+    the new version.
+    """
+
+    keys = [_version_key(kind, ident) for ident in idents]
+    if kind in (LISTING, CAPACITY) and idents:
+        keys.append(_version_key(LISTINGS, ALL))
+
+    def apply():
+        for key in keys:
+            try:
+                cache.incr(key)
+            except ValueError:
+                # never read (or evicted): the next read starts a fresh version
+                pass
+
+    transaction.on_commit(apply)
+
+
+def cached(kind: str, ident, loader):
+    key = f"{kind}:{ident}:v{version(kind, ident)}"
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        with _lock:
+            _hits[kind] += 1
+        return value
+
+    with _lock:
+        _misses[kind] += 1
+    # the version may already be bumped past what a lagging replica returns
+    with primary():
+        value = loader()
+    cache.set(key, value, TIMEOUTS[kind])
+    return value
+
+
+def stats() -> dict:
+    with _lock:
+        hits, misses = dict(_hits), dict(_misses)
+    result = {}
+    for kind in TIMEOUTS:
+        total = hits.get(kind, 0) + misses.get(kind, 0)
+        result[kind] = {
+            "hits": hits.get(kind, 0),
+            "misses": misses.get(kind, 0),
+            "hit_ratio": round(hits.get(kind, 0) / total, 4) if total else None,
+        }
+    return result
+
+
+# -- hot reads --
+
+
+def get_listing(listing_id):
+    """The listing with its seller and capacity totals, or None."""
+    return cached(
+        LISTING,
+        listing_id,
+        lambda: LuggageListing.objects.select_related("seller")
+        .with_capacity()
+        .filter(id=listing_id)
+        .first(),
+    )
+
+
+def apply_capacity(listing):
+    """Set the cached capacity totals on ``listing`` so its kg properties skip the DB."""
+    totals = cached(CAPACITY, listing.pk, listing.capacity_totals)
+    for name, value in totals.items():
+        setattr(listing, name, value)
+    return listing
+
+
+def unread_count(user) -> int:
+    if not user.is_authenticated:
+        return 0
+    return cached(UNREAD, user.pk, lambda: Message.get_unread_message_count_by_user(user))
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+# marketplace cards are cached one fragment each, and the page is not paginated
+MIN_CULLING_ENTRIES = 10000
+
+
+@register(deploy=True)
+def shared_cache_check(app_configs, **kwargs):
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend.rsplit(".", 1)[-1] in ("LocMemCache", "DummyCache"):
+        return [
+            Warning(
+                "The default cache is not shared between worker processes.",
+                hint=(
+                    "exchange.cache versions are not seen by other workers, so they "
+                    "serve stale entries. Set CACHE_BACKEND to redis or memcached."
+                ),
+                id="exchange.W001",
+            )
+        ]
+    return []
+
+
+@register(deploy=True)
+def cache_size_check(app_configs, **kwargs):
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend.rsplit(".", 1)[-1] not in ("LocMemCache", "FileBasedCache"):
+        return []
+    max_entries = settings.CACHES["default"].get("OPTIONS", {}).get("MAX_ENTRIES", 300)
+    if max_entries < MIN_CULLING_ENTRIES:
+        return [
+            Warning(
+                f"The default cache culls past {max_entries} entries.",
+                hint=(
+                    "Listing card fragments evict each other and the marketplace "
+                    f"renders cold. Set CACHE_MAX_ENTRIES to at least {MIN_CULLING_ENTRIES}, "
+                    "or use redis or memcached."
+                ),
+                id="exchange.W002",
+            )
+        ]
+    return []
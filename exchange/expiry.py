@@ -0,0 +1,164 @@
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from exchange import cache
+from exchange.models import LuggageListing, LuggageReservation, RedeemedLinkToken, Request
+from exchange.notifications import (
+    notify_holds_expired,
+    notify_later,
+    notify_listing_subscribers,
+    notify_listings_expired,
+    notify_requests_expired,
+)
+from exchange.waitlist import promote
+
+
+@dataclass
+class SweepResult:
+    name: str
+    count: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+
+def _sweep(name, queryset, apply, batch_size: int, progress=None) -> SweepResult:
+    """Repeatedly take ``batch_size`` matching pks and hand them to ``apply``.
+
+    ``apply`` must make the rows stop matching ``queryset`` (update or delete),
+    so every round simply re-reads the head of the set.
+    """
+    result = SweepResult(name=name)
+    started = time.monotonic()
+    while True:
+        pks = list(queryset.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            break
+        with transaction.atomic():
+            result.count += apply(pks)
+        result.batches += 1
+        if progress:
+            progress(result)
+        if len(pks) < batch_size:
+            break
+    result.seconds = time.monotonic() - started
+    return result
+
+
+def deactivate_expired_listings(batch_size: int = 500, notify: bool = True, progress=None):
+    today = timezone.localdate()
+    queryset = LuggageListing.objects.filter(is_active=True, available_until__lt=today)
+
+    def apply(pks):
+        updated = LuggageListing.objects.filter(pk__in=pks, is_active=True).update(
+            is_active=False, updated_at=timezone.now()
+        )
+        cache.bump(cache.LISTING, *pks)
+        if notify:
+            transaction.on_commit(lambda: notify_listings_expired(pks))
+        return updated
+
+    return _sweep("listings", queryset, apply, batch_size, progress)
+
+
+def cancel_expired_holds(batch_size: int = 500, notify: bool = True, progress=None):
+    """Cancel pending reservations older than ``LUGGAGE_PENDING_HOLD_HOURS``.
+
+    Each batch locks the affected listings, cancels the holds in one UPDATE,
+    hands the freed kg to the waitlist and announces listings that were sold
+    out and now have space again.
+    """
+    if not settings.LUGGAGE_PENDING_HOLD_HOURS:
+        return SweepResult(name="holds")
+    cutoff = timezone.now() - timedelta(hours=settings.LUGGAGE_PENDING_HOLD_HOURS)
+    # served by luggage_res_status_created_idx
+    queryset = LuggageReservation.objects.filter(
+        status=LuggageReservation.STATUS_PENDING, created_at__lt=cutoff
+    )
+
+    def apply(pks):
+        listing_ids = set(
+            LuggageReservation.objects.filter(pk__in=pks).values_list("listing_id", flat=True)
+        )
+        # in pk order, so overlapping sweeps cannot deadlock
+        listings = list(
+            LuggageListing.objects.select_for_update().filter(pk__in=listing_ids).order_by("pk")
+        )
+        # read under the listing locks: a seller may have reserved or rejected
+        # some of these holds since they were selected
+        holds = list(
+            LuggageReservation.objects.select_for_update()
+            .filter(pk__in=pks, status=LuggageReservation.STATUS_PENDING)
+            .values_list("pk", "listing_id", "kg_requested")
+        )
+        cancelled = [pk for pk, _listing_id, _kg in holds]
+        freed = {}
+        for _pk, listing_id, kg in holds:
+            freed[listing_id] = freed.get(listing_id, 0) + kg
+        committed = dict(
+            LuggageListing.objects.filter(pk__in=freed)
+            .with_capacity()
+            .values_list("pk", "committed_kg_total")
+        )
+        updated = LuggageReservation.objects.filter(pk__in=cancelled).update(
+            status=LuggageReservation.STATUS_CANCELLED, updated_at=timezone.now()
+        )
+        cache.bump(cache.LISTING, *freed)
+        cache.bump(cache.CAPACITY, *freed)
+
+        reopened = []
+        for listing in listings:
+            if listing.pk not in freed:
+                continue
+            was_sold_out = listing.total_kg - committed[listing.pk] <= 0
+            free_kg = listing.total_kg - committed[listing.pk] + freed[listing.pk]
+            free_kg -= sum(r.kg_requested for r in promote(listing, free_kg))
+            if was_sold_out and free_kg > 0:
+                reopened.append(listing)
+
+        if notify:
+            notify_later(notify_holds_expired, cancelled)
+            for listing in reopened:
+                notify_later(notify_listing_subscribers, listing, "reopened")
+        return updated
+
+    return _sweep("holds", queryset, apply, batch_size, progress)
+
+
+def complete_past_deadline_requests(batch_size: int = 500, notify: bool = True, progress=None):
+    queryset = Request.objects.filter(status="active", deadline__lt=timezone.now())
+
+    def apply(pks):
+        updated = Request.objects.filter(pk__in=pks, status="active").update(
+            status="completed"
+        )
+        cache.bump(cache.OFFERS, cache.ALL)
+        if notify:
+            transaction.on_commit(lambda: notify_requests_expired(pks))
+        return updated
+
+    return _sweep("requests", queryset, apply, batch_size, progress)
+
+
+def delete_expired_link_tokens(batch_size: int = 1000, progress=None):
+    # a row must outlive its token to keep it single-use, so only expiry counts
+    queryset = RedeemedLinkToken.objects.filter(expires_at__lt=timezone.now())
+
+    def apply(pks):
+        deleted, _ = RedeemedLinkToken.objects.filter(pk__in=pks).delete()
+        return deleted
+
+    return _sweep("link_tokens", queryset, apply, batch_size, progress)
+
+
+def sweep_expired(batch_size: int = 500, notify: bool = True, progress=None) -> list:
+    return [
+        deactivate_expired_listings(batch_size, notify=notify, progress=progress),
+        cancel_expired_holds(batch_size, notify=notify, progress=progress),
+        complete_past_deadline_requests(batch_size, notify=notify, progress=progress),
+        delete_expired_link_tokens(batch_size, progress=progress),
+    ]
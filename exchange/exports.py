@@ -0,0 +1,161 @@
+"""Streaming CSV / JSON Lines exports of reservations, listings and offers.
+
+Rows come from ``values_list().iterator(chunk_size=...)``, which reads through
+a server-side cursor on PostgreSQL, and are written out a chunk at a time as
+the response streams. Memory stays flat however many rows match. CSV text
+cells that start like a formula are prefixed with ``'``; JSON Lines keep the
+raw values.
+"""
+
+import csv
+import io
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from exchange.models import LuggageListing, LuggageReservation, Request
+
+CHUNK_SIZE = 2000
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+}
+# a spreadsheet evaluates a cell starting with one of these as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+@dataclass(frozen=True)
+class Export:
+    model: type
+    # (header, values_list lookup)
+    columns: tuple
+    # status filter value -> queryset filter
+    statuses: dict
+
+
+EXPORTS = {
+    "reservations": Export(
+        model=LuggageReservation,
+        columns=(
+            ("id", "id"),
+            ("listing_id", "listing_id"),
+            ("listing", "listing__title"),
+            ("buyer", "buyer__username"),
+            ("kg_requested", "kg_requested"),
+            ("contact_handle", "contact_handle"),
+            ("note", "note"),
+            ("status", "status"),
+            ("created_at", "created_at"),
+            ("updated_at", "updated_at"),
+        ),
+        statuses={
+            value: {"status": value} for value, _label in LuggageReservation.STATUS_CHOICES
+        },
+    ),
+    "listings": Export(
+        model=LuggageListing,
+        columns=(
+            ("id", "id"),
+            ("title", "title"),
+            ("seller", "seller__username"),
+            ("departure_city", "departure_city"),
+            ("arrival_city", "arrival_city"),
+            ("available_until", "available_until"),
+            ("arrival_datetime", "arrival_datetime"),
+            ("total_kg", "total_kg"),
+            ("price_per_kg", "price_per_kg"),
+            ("price_currency", "price_currency"),
+            ("is_active", "is_active"),
+            ("created_at", "created_at"),
+            ("updated_at", "updated_at"),
+        ),
+        statuses={"active": {"is_active": True}, "inactive": {"is_active": False}},
+    ),
+    "offers": Export(
+        model=Request,
+        columns=(
+            ("id", "id"),
+            ("user", "user__username"),
+            ("type", "type"),
+            ("amount", "amount"),
+            ("currency", "currency"),
+            ("deadline", "deadline"),
+            ("urgent", "urgent"),
+            ("conditions", "conditions"),
+            ("status", "status"),
+            ("created_at", "created_at"),
+        ),
+        statuses={value: {"status": value} for value, _label in Request.STATUS_CHOICES},
+    ),
+}
+KIND_BY_MODEL = {export.model: kind for kind, export in EXPORTS.items()}
+
+
+def _start_of(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def apply_filters(queryset, kind, created_from=None, created_to=None, status=""):
+    """Filter by creation date (both ends inclusive) and status.
+
+    Days are turned into datetime bounds, so the created_at indexes still apply.
+    """
+    if created_from:
+        queryset = queryset.filter(created_at__gte=_start_of(created_from))
+    if created_to:
+        queryset = queryset.filter(created_at__lt=_start_of(created_to + timedelta(days=1)))
+    if status:
+        queryset = queryset.filter(**EXPORTS[kind].statuses[status])
+    return queryset
+
+
+def _csv_cell(value):
+    """Quote user text that a spreadsheet would run as a formula (CSV injection)."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def _csv_chunks(header, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for count, row in enumerate(rows, 1):
+        writer.writerow([_csv_cell(value) for value in row])
+        if count % CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _jsonl_chunks(header, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    lines = []
+    for row in rows:
+        lines.append(encoder.encode(dict(zip(header, row))))
+        if len(lines) == CHUNK_SIZE:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def export_response(queryset, fmt="csv", filename=None):
+    """Stream ``queryset`` (of a model in ``EXPORTS``) as a CSV or JSONL download."""
+    kind = KIND_BY_MODEL[queryset.model]
+    header = [name for name, _lookup in EXPORTS[kind].columns]
+    rows = (
+        queryset.order_by("created_at", "pk")
+        .values_list(*[lookup for _name, lookup in EXPORTS[kind].columns])
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    chunks = _csv_chunks(header, rows) if fmt == "csv" else _jsonl_chunks(header, rows)
+
+    filename = filename or f"{kind}-{timezone.now():%Y%m%d-%H%M%S}.{fmt}"
+    response = StreamingHttpResponse(chunks, content_type=FORMATS[fmt])
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,111 @@
+"""A stub of the Telegram Bot API for load tests.
+
+Run the app with ``TELEGRAM_API_BASE_URL`` pointing at this server and
+``TELEGRAM_BOT_TOKEN`` set to anything; every ``sendMessage`` call is recorded
+instead of delivered, optionally after injected latency or with a 429.
+"""
+
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+@dataclass
+class Delivery:
+    chat_id: str
+    text: str
+    received_at: float
+    rate_limited: bool
+
+
+class FakeTelegramServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), latency_ms: float = 0, rate_limit_ratio: float = 0):
+        super().__init__(address, _Handler)
+        self.latency_ms = latency_ms
+        self.rate_limit_ratio = rate_limit_ratio
+        self.deliveries = []
+        self._lock = threading.Lock()
+        self._random = random.Random()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def record(self, chat_id: str, text: str) -> bool:
+        """Store a delivery; returns False when this call should be answered with a 429."""
+        with self._lock:
+            rate_limited = self._random.random() < self.rate_limit_ratio
+            self.deliveries.append(
+                Delivery(
+                    chat_id=chat_id,
+                    text=text,
+                    received_at=time.time(),
+                    rate_limited=rate_limited,
+                )
+            )
+        return not rate_limited
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return list(self.deliveries)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeTelegramServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            data = json.loads(raw.decode("utf-8") or "{}")
+        except ValueError:
+            data = {}
+
+        if self.server.latency_ms:
+            time.sleep(self.server.latency_ms / 1000)
+
+        method = self.path.rsplit("/", 1)[-1]
+        if method != "sendMessage":
+            self._reply(200, {"ok": True, "result": True})
+            return
+
+        if not self.server.record(str(data.get("chat_id", "")), data.get("text", "")):
+            self._reply(
+                429,
+                {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": "Too Many Requests: retry after 1",
+                    "parameters": {"retry_after": 1},
+                },
+            )
+            return
+
+        self._reply(200, {"ok": True, "result": {"message_id": len(self.server.deliveries)}})
@@ -1,5 +1,13 @@
 from django import forms
-from exchange.models import Request, Message, LuggageListing, LuggageReservation
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
+from exchange.models import (
+    Request,
+    Message,
+    LuggageListing,
+    LuggageReservation,
+    LuggageWaitlistEntry,
+)
 
 
 class RequestForm(forms.ModelForm):
@@ -160,3 +168,49 @@ class LuggageReservationForm(forms.ModelForm):
         if reservation.kg_requested:
             reservation.clean()
         return cleaned_data
+
+
+class LuggageWaitlistForm(forms.ModelForm):
+    class Meta:
+        model = LuggageWaitlistEntry
+        fields = ["kg_requested", "contact_handle", "note"]
+        widgets = LuggageReservationForm.Meta.widgets
+
+    def __init__(self, *args, listing=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.listing = listing
+
+    def clean_kg_requested(self):
+        kg_requested = self.cleaned_data["kg_requested"]
+        if kg_requested <= 0:
+            raise ValidationError(_("Reserved kg must be greater than 0."))
+        if self.listing and kg_requested > self.listing.total_kg:
+            # such an entry could never be promoted
+            raise ValidationError(
+                _("This listing only has %(total)s kg in total.")
+                % {"total": self.listing.total_kg}
+            )
+        if self.listing and kg_requested <= self.listing.remaining_kg:
+            raise ValidationError(_("This much space is still free; reserve it directly."))
+        return kg_requested
+
+
+class ExportForm(forms.Form):
+    """Filters of the seller export views (``exchange.exports``)."""
+
+    format = forms.ChoiceField(choices=[("csv", "CSV"), ("jsonl", "JSON Lines")], required=False)
+    created_from = forms.DateField(required=False, input_formats=["%Y-%m-%d"])
+    created_to = forms.DateField(required=False, input_formats=["%Y-%m-%d"])
+    status = forms.ChoiceField(required=False)
+    listing = forms.UUIDField(required=False)
+
+    def __init__(self, *args, statuses=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["status"].choices = [("", "")] + [(value, value) for value in statuses]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        created_from, created_to = cleaned_data.get("created_from"), cleaned_data.get("created_to")
+        if created_from and created_to and created_from > created_to:
+            raise ValidationError(_("The start date must not be after the end date."))
+        return cleaned_data
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from exchange.memberships import backfill_read_pointers
+
+
+class Command(BaseCommand):
+    help = """Create the missing ConversationMembership rows, with read pointers
+    derived from the old Message.is_read flags, in batches. Existing rows are
+    left alone, so it is safe to re-run; run it once after migrating to
+    0012_conversation_membership."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Conversations per batch. Default: 1000.",
+        )
+
+    def _progress(self, result):
+        if self.verbosity > 1:
+            self.stdout.write(
+                f"...{result.conversations} conversations in {result.batches} batches"
+            )
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        result = backfill_read_pointers(
+            batch_size=max(1, options["batch_size"]), progress=self._progress
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Backfilled {result.conversations} conversations ({result.memberships} "
+                f"memberships, existing ones skipped) in {result.seconds:.2f}s."
+            )
+        )
@@ -0,0 +1,156 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.test import Client
+from django.urls import reverse
+
+from base.db import connection_stats
+from exchange.benchmarking import ensure_fixtures, percentile
+
+# Environment for each connection strategy; settings are read at startup, so
+# every mode runs in its own process.
+MODES = {
+    "per-request": {"DB_POOL": "false", "DB_CONN_MAX_AGE": "0"},
+    "persistent": {"DB_POOL": "false", "DB_CONN_MAX_AGE": "600"},
+    "pool": {"DB_POOL": "true"},
+}
+
+
+class Command(BaseCommand):
+    help = """Compare per-request latency with a new connection per request,
+    persistent connections and a psycopg connection pool.
+
+    Each mode runs in a fresh process with its DB_* environment applied and
+    serves --iterations listing detail requests through the test client, split
+    across --concurrency threads. Run it against PostgreSQL, where connection
+    setup (and TLS) is what is being measured; the pool mode needs
+    `uv sync --extra pool`."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations", type=int, default=200, help="Requests per mode. Default: 200."
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Threads issuing requests, like gunicorn --threads. Default: 1.",
+        )
+        parser.add_argument(
+            "--modes",
+            nargs="*",
+            default=list(MODES),
+            choices=list(MODES),
+            help="Modes to run. Default: all.",
+        )
+        parser.add_argument("--output", help="Write the results JSON to this path.")
+        parser.add_argument("--child", help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options["child"]:
+            self.stdout.write(json.dumps(self._run(options["iterations"], options["concurrency"])))
+            return
+
+        ensure_fixtures()
+        results = {}
+        for mode in options["modes"]:
+            if mode == "pool" and connection.vendor != "postgresql":
+                self.stdout.write(f"{mode:<12} skipped: pooling needs PostgreSQL")
+                continue
+            results[mode] = self._spawn(mode, options)
+            self._print_result(mode, results[mode])
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(results, fh, indent=2)
+                fh.write("\n")
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def _spawn(self, mode, options):
+        # size the pool for the thread count, as gunicorn --threads would
+        env = {**os.environ, **MODES[mode], "GUNICORN_THREADS": str(options["concurrency"])}
+        proc = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "django",
+                "benchmark_connections",
+                "--child",
+                mode,
+                "--iterations",
+                str(options["iterations"]),
+                "--concurrency",
+                str(options["concurrency"]),
+            ],
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode:
+            raise CommandError(f"{mode} run failed:\n{proc.stderr}")
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+
+    def _run(self, iterations, concurrency):
+        fixtures = ensure_fixtures()
+        path = reverse("luggage_listing_detail", kwargs={"listing_id": fixtures.listing.id})
+        # drop the connection ensure_fixtures opened, so every mode starts cold
+        connection.close()
+
+        timings = []
+        lock = threading.Lock()
+        per_thread = [iterations // concurrency] * concurrency
+        per_thread[0] += iterations % concurrency
+
+        def worker(count):
+            client = Client(HTTP_HOST="localhost")
+            client.force_login(fixtures.buyer)
+            local = []
+            for _ in range(count):
+                started = time.perf_counter()
+                # the test client skips the connection handling the WSGI handler
+                # does on request_started/request_finished, so do it here
+                close_old_connections()
+                client.get(path)
+                close_old_connections()
+                local.append((time.perf_counter() - started) * 1000)
+            with lock:
+                timings.extend(local)
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(count,)) for count in per_thread]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        stats = connection_stats()["default"]
+        return {
+            "p50_ms": round(percentile(timings, 0.5), 3),
+            "p95_ms": round(percentile(timings, 0.95), 3),
+            "mean_ms": round(statistics.fmean(timings), 3),
+            "throughput_rps": round(len(timings) / elapsed, 2),
+            "connects": stats["connects"],
+            "pool": stats["pool"],
+        }
+
+    def _print_result(self, mode, result):
+        line = (
+            f"{mode:<12} p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+            f"{result['throughput_rps']:>8.1f} req/s  connects {result['connects']}"
+        )
+        pool = result["pool"]
+        if pool:
+            line += (
+                f"  pool checkouts {pool['checkouts']} waits {pool['waits']} "
+                f"overflow {pool['overflow']}"
+            )
+        self.stdout.write(line)
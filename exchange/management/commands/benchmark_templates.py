@@ -0,0 +1,104 @@
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.utils import timezone
+
+from exchange.models import LuggageListing
+
+TEMPLATE = "exchange/luggage_marketplace.html"
+CARD_TEMPLATE = "exchange/snippets/luggage_listing_card.html"
+
+
+def fake_listings(count, seller):
+    """Unsaved listings with their capacity totals set, so rendering runs no queries."""
+    now = timezone.now()
+    listings = []
+    for index in range(count):
+        listing = LuggageListing(
+            id=uuid4(),
+            seller=seller,
+            title=f"Listing {index}",
+            departure_city="Tokyo",
+            arrival_city="Tashkent",
+            available_until=timezone.localdate() + timedelta(days=30),
+            arrival_datetime=now + timedelta(days=31),
+            pickup_location_tokyo="Shinjuku",
+            total_kg=Decimal("23.00"),
+            price_per_kg=Decimal("1500") + index,
+            price_currency="JPY",
+            updated_at=now,
+        )
+        listing.committed_kg_total = Decimal(index % 24)
+        listing.reserved_kg_total = Decimal("0")
+        listings.append(listing)
+    return listings
+
+
+class Command(BaseCommand):
+    help = """Time marketplace template rendering for 50, 500 and 5000 listing
+    cards, without any database work.
+
+    "cold" renders fresh listings, so every card fragment is rendered and
+    written to the cache; "warm" renders the same listings again and reads
+    every card from the cache. The 0-card row is the page layout alone. Cold
+    runs leave their fragments in the default cache until they expire."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cards", type=int, nargs="*", default=[50, 500, 5000], help="Card counts to render."
+        )
+        parser.add_argument(
+            "--iterations", type=int, default=5, help="Timed renders per case. Default: 5."
+        )
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get("/exchange/luggage/", HTTP_HOST="localhost")
+        request.user = AnonymousUser()
+        seller = get_user_model()(username="bench_template_seller")
+
+        loaders = engines["django"].engine.loaders
+        self.stdout.write(f"loaders: {loaders}")
+        # a culling backend smaller than the card count makes warm runs miss
+        cache_options = settings.CACHES["default"].get("OPTIONS", {})
+        self.stdout.write(
+            f"fragment cache: {settings.CACHES['default']['BACKEND']} "
+            f"(MAX_ENTRIES {cache_options.get('MAX_ENTRIES', '-')})"
+        )
+        started = time.perf_counter()
+        engines["django"].engine.get_template(TEMPLATE)
+        self.stdout.write(f"first template lookup: {(time.perf_counter() - started) * 1000:.2f}ms")
+        started = time.perf_counter()
+        engines["django"].engine.get_template(TEMPLATE)
+        self.stdout.write(f"repeat template lookup: {(time.perf_counter() - started) * 1000:.3f}ms\n")
+
+        self.stdout.write(
+            f"{'cards':>6} {'cold p50':>11} {'warm p50':>11} {'cold/card':>11} {'warm/card':>11}"
+        )
+        for count in [0] + options["cards"]:
+            cold, warm = [], []
+            for _ in range(options["iterations"]):
+                listings = fake_listings(count, seller)
+                context = {"listings": listings, "sort": "newest", "base_currency": "JPY"}
+                cold.append(self._render(context, request))
+                warm.append(self._render(context, request))
+
+            cold_ms, warm_ms = statistics.median(cold), statistics.median(warm)
+            per_card = (
+                f"{cold_ms / count:>9.3f}ms {warm_ms / count:>9.3f}ms" if count else f"{'-':>11} {'-':>11}"
+            )
+            self.stdout.write(f"{count:>6} {cold_ms:>9.2f}ms {warm_ms:>9.2f}ms {per_card}")
+
+    def _render(self, context, request):
+        started = time.perf_counter()
+        render_to_string(TEMPLATE, context, request=request)
+        return (time.perf_counter() - started) * 1000
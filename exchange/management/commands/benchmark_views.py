@@ -0,0 +1,301 @@
+import json
+import platform
+import statistics
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from exchange.benchmarking import (
+    BENCHMARK_NOTE,
+    ensure_fixtures,
+    http_call,
+    percentile,
+    session_cookies,
+    webhook_payload,
+)
+from exchange.models import LuggageReservation
+
+# Fixed dataset so numbers are comparable between runs and releases.
+DATASET = {
+    "users": 1000,
+    "requests": 5000,
+    "conversations": 5000,
+    "messages": 50000,
+    "listings": 2000,
+    "reservations": 10000,
+    "subscriptions": 2000,
+    "seed": 2024,
+}
+
+# Scenarios that create rows. In-process runs roll them back; runs against a
+# server delete the reservations they made afterwards.
+WRITE_SCENARIOS = {"reservation_post"}
+
+
+class QueryCounter:
+    """``execute_wrapper`` counting statements without keeping their SQL around."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def scenarios(fixtures):
+    """``(name, method, path, data, as_user, extra_headers)`` for every benchmarked view."""
+    listing = fixtures.listing
+    conversation = fixtures.conversation
+    webhook_headers = {"Content-Type": "application/json"}
+    secret = getattr(settings, "TELEGRAM_WEBHOOK_SECRET", "") or ""
+    if secret:
+        webhook_headers["X-Telegram-Bot-Api-Secret-Token"] = secret
+
+    return [
+        ("marketplace", "GET", reverse("luggage_marketplace"), None, None, {}),
+        (
+            "listing_detail",
+            "GET",
+            reverse("luggage_listing_detail", kwargs={"listing_id": listing.id}),
+            None,
+            fixtures.buyer,
+            {},
+        ),
+        (
+            "reservation_post",
+            "POST",
+            reverse("luggage_reserve", kwargs={"listing_id": listing.id}),
+            {"kg_requested": "0.01", "contact_handle": "", "note": BENCHMARK_NOTE},
+            fixtures.buyer,
+            {},
+        ),
+        ("conversations_list", "GET", reverse("conversations_list"), None, fixtures.buyer, {}),
+        (
+            "conversation",
+            "GET",
+            reverse("conversation", kwargs={"conversation_id": conversation.id}),
+            None,
+            fixtures.buyer,
+            {},
+        ),
+        (
+            "telegram_webhook",
+            "POST",
+            reverse("telegram_webhook"),
+            webhook_payload(fixtures.buyer.telegram_chat_id, "/status"),
+            None,
+            webhook_headers,
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = """Benchmark the main exchange and luggage views: p50/p95 latency,
+    queries per request and throughput, optionally compared with a stored
+    baseline JSON.
+
+    By default requests go through the Django test client in this process. Pass
+    --base-url to drive a running server instead (e.g. gunicorn against a local
+    PostgreSQL); query counts are then not available.
+
+    It writes to the configured database (fixtures, reservations), so it only
+    runs with DEBUG on unless --allow-writes is given."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations", type=int, default=50, help="Timed requests per view. Default: 50."
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=5, help="Untimed requests per view. Default: 5."
+        )
+        parser.add_argument(
+            "--seed-data",
+            action="store_true",
+            help="Seed the fixed benchmark dataset with create_dummy_data first.",
+        )
+        parser.add_argument(
+            "--base-url",
+            help="Benchmark a running server, e.g. http://127.0.0.1:8000.",
+        )
+        parser.add_argument(
+            "--only", nargs="*", help="Only run these scenarios (by name)."
+        )
+        parser.add_argument(
+            "--allow-writes",
+            action="store_true",
+            help="Run even with DEBUG off. Never point this at production data.",
+        )
+        parser.add_argument("--output", help="Write the results JSON to this path.")
+        parser.add_argument("--baseline", help="Compare with this results JSON.")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Allowed relative p95/query regression against the baseline. Default: 0.2.",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Exit with an error when a regression beyond --tolerance is found.",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["allow_writes"]:
+            raise CommandError(
+                "benchmark_views writes benchmark fixtures and reservations to the "
+                f"{connection.settings_dict['NAME']!r} database. Run it with DEBUG on, "
+                "or pass --allow-writes if that database is disposable."
+            )
+
+        if options["seed_data"]:
+            call_command("create_dummy_data", stdout=self.stdout, **DATASET)
+
+        fixtures = ensure_fixtures()
+        base_url = (options["base_url"] or "").rstrip("/")
+        results = {}
+
+        for name, method, path, data, user, headers in scenarios(fixtures):
+            if options["only"] and name not in options["only"]:
+                continue
+            call = self._http_caller(base_url, user) if base_url else self._client_caller(user)
+
+            if name not in WRITE_SCENARIOS:
+                results[name] = self._run(call, method, path, data, headers, options)
+            elif base_url:
+                started_at = timezone.now()
+                try:
+                    results[name] = self._run(call, method, path, data, headers, options)
+                finally:
+                    LuggageReservation.objects.filter(
+                        buyer=fixtures.buyer, note=BENCHMARK_NOTE, created_at__gte=started_at
+                    ).delete()
+            else:
+                with transaction.atomic():
+                    results[name] = self._run(call, method, path, data, headers, options)
+                    transaction.set_rollback(True)
+            self._print_result(name, results[name])
+
+        report = {
+            "meta": {
+                "created_at": timezone.now().isoformat(),
+                "mode": "http" if base_url else "client",
+                "iterations": options["iterations"],
+                "database": connection.vendor,
+                "django": django.get_version(),
+                "python": platform.python_version(),
+            },
+            "scenarios": results,
+        }
+
+        if options["output"]:
+            Path(options["output"]).parent.mkdir(parents=True, exist_ok=True)
+            Path(options["output"]).write_text(json.dumps(report, indent=2) + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if options["baseline"]:
+            regressions = self._compare(report, options["baseline"], options["tolerance"])
+            if regressions and options["fail_on_regression"]:
+                raise CommandError(f"Regressions found: {', '.join(regressions)}")
+
+    def _run(self, call, method, path, data, headers, options) -> dict:
+        for _ in range(options["warmup"]):
+            call(method, path, data, headers)
+
+        timings, query_counts, statuses = [], [], {}
+        started = time.perf_counter()
+        for _ in range(options["iterations"]):
+            request_started = time.perf_counter()
+            status, queries = call(method, path, data, headers)
+            timings.append((time.perf_counter() - request_started) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+            if queries is not None:
+                query_counts.append(queries)
+        elapsed = time.perf_counter() - started
+
+        return {
+            "p50_ms": round(percentile(timings, 0.5), 3),
+            "p95_ms": round(percentile(timings, 0.95), 3),
+            "mean_ms": round(statistics.fmean(timings), 3),
+            "queries": round(statistics.fmean(query_counts), 2) if query_counts else None,
+            "throughput_rps": round(len(timings) / elapsed, 2),
+            "statuses": {str(code): count for code, count in statuses.items()},
+        }
+
+    def _client_caller(self, user):
+        client = Client(HTTP_HOST="localhost")
+        if user is not None:
+            client.force_login(user)
+
+        def call(method, path, data, headers):
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                if method == "GET":
+                    response = client.get(path, headers=headers)
+                elif isinstance(data, bytes):
+                    response = client.post(
+                        path,
+                        data=data,
+                        content_type=headers.get("Content-Type", "application/octet-stream"),
+                        headers=headers,
+                    )
+                else:
+                    response = client.post(path, data=data, headers=headers)
+            return response.status_code, counter.count
+
+        return call
+
+    def _http_caller(self, base_url, user):
+        cookies = session_cookies(user) if user is not None else {}
+
+        def call(method, path, data, headers):
+            return http_call(base_url, method, path, cookies=cookies, data=data, headers=headers), None
+
+        return call
+
+    def _print_result(self, name, result):
+        queries = "-" if result["queries"] is None else f"{result['queries']:.1f}"
+        self.stdout.write(
+            f"{name:<20} p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+            f"queries {queries:>5}  {result['throughput_rps']:>8.1f} req/s  "
+            f"statuses {result['statuses']}"
+        )
+
+    def _compare(self, report, baseline_path, tolerance):
+        try:
+            baseline = json.loads(Path(baseline_path).read_text())
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Could not read baseline {baseline_path}: {exc}") from exc
+
+        regressions = []
+        self.stdout.write(f"\nCompared with {baseline_path}:")
+        for name, result in report["scenarios"].items():
+            previous = baseline.get("scenarios", {}).get(name)
+            if not previous:
+                self.stdout.write(f"{name:<20} (not in baseline)")
+                continue
+
+            parts = []
+            for metric in ("p50_ms", "p95_ms", "queries"):
+                old, new = previous.get(metric), result.get(metric)
+                if old is None or new is None:
+                    continue
+                change = (new - old) / old if old else 0.0
+                parts.append(f"{metric} {old} -> {new} ({change:+.0%})")
+                if metric in ("p95_ms", "queries") and change > tolerance:
+                    regressions.append(f"{name}.{metric}")
+
+            line = f"{name:<20} " + ", ".join(parts)
+            if any(r.startswith(f"{name}.") for r in regressions):
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        return regressions
@@ -1,37 +1,313 @@
 # exchange/management/commands/create_dummy_data.py
 
+import hashlib
+import multiprocessing
 import random
+import time
+import uuid
+from dataclasses import dataclass
 from datetime import timedelta
 from decimal import Decimal
 
-from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
-from django.conf import settings
-from django.db import IntegrityError, transaction
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
 from django.utils import timezone
-from django.utils.translation import gettext_lazy as _  # Keep this if used elsewhere
 
-from faker import Faker  # Import Faker
+from faker import Faker
 
-# Import your models
-from exchange.models import Request, Conversation, Message
+from exchange import rates
+from exchange.memberships import backfill_read_pointers
+from exchange.models import (
+    Conversation,
+    LuggageListing,
+    LuggageReservation,
+    LuggageTelegramSubscription,
+    Message,
+    Request,
+)
 
-# Get the User model configured in settings
 User = get_user_model()
 
+CITIES = ["Tashkent", "Samarkand", "Bukhara", "Namangan", "Tokyo", "Osaka", "Nagoya"]
+
+
+@dataclass
+class Plan:
+    """Everything a worker needs to rebuild any row from its index alone."""
+
+    seed: int
+    users: int
+    requests: int
+    conversations: int
+    messages: int
+    listings: int
+    reservations: int
+    subscriptions: int
+    telegram_ratio: float
+    password_hash: str
+    rates: dict
+    now: object
+
+
+# Rows are generated from (seed, kind, index) only, so parents never have to be
+# held in memory or shipped to workers: a child recomputes its parent's id.
+
+
+def _digest(plan: Plan, kind: str, index: int) -> bytes:
+    return hashlib.blake2b(
+        f"{plan.seed}:{kind}:{index}".encode(), digest_size=16
+    ).digest()
+
+
+def _uuid(plan: Plan, kind: str, index: int) -> uuid.UUID:
+    return uuid.UUID(bytes=_digest(plan, kind, index), version=4)
+
+
+def _pick(plan: Plan, kind: str, index: int, size: int) -> int:
+    return int.from_bytes(_digest(plan, kind, index)[:8], "big") % size
+
+
+def _request_owner(plan: Plan, index: int) -> int:
+    return _pick(plan, "request-owner", index, plan.users)
+
+
+def _listing_seller(plan: Plan, index: int) -> int:
+    return _pick(plan, "listing-seller", index, plan.users)
+
+
+def _other_user(plan: Plan, kind: str, owner: int, slot: int, parent: int) -> int:
+    # distinct slots of the same parent always map to distinct users != owner
+    offset = (slot + _pick(plan, kind, parent, plan.users - 1)) % (plan.users - 1)
+    return (owner + 1 + offset) % plan.users
+
+
+def _conversation_participants(plan: Plan, index: int):
+    request_index = index % plan.requests
+    owner = _request_owner(plan, request_index)
+    other = _other_user(plan, "conversation-peer", owner, index // plan.requests, request_index)
+    p1, p2 = sorted([_uuid(plan, "user", owner), _uuid(plan, "user", other)])
+    return request_index, p1, p2
+
+
+def _rng(plan: Plan, kind: str, start: int) -> random.Random:
+    return random.Random(f"{plan.seed}:{kind}:{start}")
+
+
+_fake = None
+
+
+def _faker(plan: Plan, kind: str, start: int) -> Faker:
+    global _fake
+    if _fake is None:
+        _fake = Faker()
+    _fake.seed_instance(f"{plan.seed}:{kind}:{start}")
+    return _fake
+
+
+def build_users(plan: Plan, start: int, stop: int):
+    fake = _faker(plan, "user", start)
+    rng = _rng(plan, "user", start)
+    rows = []
+    for index in range(start, stop):
+        linked = rng.random() < plan.telegram_ratio
+        rows.append(
+            User(
+                id=_uuid(plan, "user", index),
+                username=f"{fake.user_name()}_{plan.seed}_{index}",
+                email=f"user{plan.seed}_{index}@{fake.free_email_domain()}",
+                password=plan.password_hash,
+                telegram_chat_id=str(10**10 + plan.seed * 10**8 + index) if linked else None,
+                telegram_username=fake.user_name() if linked else "",
+                telegram_notifications_enabled=linked,
+                telegram_linked_at=plan.now if linked else None,
+            )
+        )
+    return User, rows
+
+
+def build_requests(plan: Plan, start: int, stop: int):
+    fake = _faker(plan, "request", start)
+    rng = _rng(plan, "request", start)
+    type_choices = [choice[0] for choice in Request.TYPE_CHOICES]
+    currency_choices = [choice[0] for choice in Request.CURRENCY_CHOICES]
+    rows = []
+    for index in range(start, stop):
+        rows.append(
+            Request(
+                id=_uuid(plan, "request", index),
+                user_id=_uuid(plan, "user", _request_owner(plan, index)),
+                type=rng.choice(type_choices),
+                amount=Decimal(rng.randint(1000, 1000000)),
+                currency=rng.choice(currency_choices),
+                deadline=plan.now
+                + timedelta(days=rng.randint(1, 90), hours=rng.randint(1, 23)),
+                urgent=rng.random() < 0.5,
+                conditions=fake.sentence() if rng.random() < 0.5 else "",
+                # ~20% completed, the rest active
+                status="completed" if rng.random() < 0.2 else "active",
+                hide_contacts=rng.random() < 0.5,
+            )
+        )
+    return Request, rows
+
+
+def build_conversations(plan: Plan, start: int, stop: int):
+    rows = []
+    for index in range(start, stop):
+        request_index, p1, p2 = _conversation_participants(plan, index)
+        rows.append(
+            Conversation(
+                id=_uuid(plan, "conversation", index),
+                request_id=_uuid(plan, "request", request_index),
+                participant1_id=p1,
+                participant2_id=p2,
+            )
+        )
+    return Conversation, rows
+
+
+def build_messages(plan: Plan, start: int, stop: int):
+    fake = _faker(plan, "message", start)
+    rng = _rng(plan, "message", start)
+    rows = []
+    for index in range(start, stop):
+        conversation_index = _pick(plan, "message-conversation", index, plan.conversations)
+        _request_index, p1, p2 = _conversation_participants(plan, conversation_index)
+        rows.append(
+            Message(
+                conversation_id=_uuid(plan, "conversation", conversation_index),
+                sender_id=p1 if rng.random() < 0.5 else p2,
+                content=fake.sentence(nb_words=rng.randint(5, 25)),
+                # ~70% read; backfill_read_pointers turns this into read pointers
+                is_read=rng.random() < 0.7,
+            )
+        )
+    return Message, rows
+
+
+def build_listings(plan: Plan, start: int, stop: int):
+    fake = _faker(plan, "listing", start)
+    rng = _rng(plan, "listing", start)
+    currency_choices = [choice[0] for choice in LuggageListing.PRICE_CURRENCY_CHOICES]
+    typical_price = {"JPY": (800, 3000), "USD": (5, 20), "UZS": (60000, 250000)}
+    today = timezone.localdate()
+    rows = []
+    for index in range(start, stop):
+        currency = rng.choice(currency_choices)
+        price = Decimal(rng.randint(*typical_price[currency]))
+        departure, arrival = rng.sample(CITIES, 2)
+        # ~10% already expired
+        days_left = rng.randint(-30, -1) if rng.random() < 0.1 else rng.randint(1, 90)
+        rows.append(
+            LuggageListing(
+                id=_uuid(plan, "listing", index),
+                seller_id=_uuid(plan, "user", _listing_seller(plan, index)),
+                title=fake.sentence(nb_words=4).rstrip(".")[:120],
+                total_kg=Decimal(rng.randint(10, 60)),
+                price_per_kg=price,
+                price_currency=currency,
+                price_per_kg_base=rates.convert(
+                    price, currency, rates.base_currency(), plan.rates
+                ).quantize(Decimal("0.000001")),
+                available_until=today + timedelta(days=days_left),
+                departure_city=departure,
+                arrival_city=arrival,
+                pickup_location_tokyo=fake.street_address()[:255],
+                delivery_options=fake.sentence() if rng.random() < 0.5 else "",
+                allowed_items=fake.sentence(),
+                prohibited_items=fake.sentence(),
+                description=fake.paragraph() if rng.random() < 0.5 else "",
+                is_active=rng.random() < 0.85,
+            )
+        )
+    return LuggageListing, rows
+
+
+def build_reservations(plan: Plan, start: int, stop: int):
+    fake = _faker(plan, "reservation", start)
+    rng = _rng(plan, "reservation", start)
+    rows = []
+    for index in range(start, stop):
+        listing_index = index % plan.listings
+        seller = _listing_seller(plan, listing_index)
+        buyer = _other_user(plan, "reservation-buyer", seller, index // plan.listings, listing_index)
+        roll = rng.random()
+        if roll < 0.3:
+            status = LuggageReservation.STATUS_PENDING
+        elif roll < 0.7:
+            status = LuggageReservation.STATUS_RESERVED
+        else:
+            status = LuggageReservation.STATUS_CANCELLED
+        rows.append(
+            LuggageReservation(
+                id=_uuid(plan, "reservation", index),
+                listing_id=_uuid(plan, "listing", listing_index),
+                buyer_id=_uuid(plan, "user", buyer),
+                kg_requested=Decimal(rng.randint(1, 10)) / 2,
+                contact_handle=fake.phone_number()[:120] if rng.random() < 0.5 else "",
+                note=fake.sentence() if rng.random() < 0.3 else "",
+                status=status,
+            )
+        )
+    return LuggageReservation, rows
+
+
+def build_subscriptions(plan: Plan, start: int, stop: int):
+    rng = _rng(plan, "subscription", start)
+    rows = []
+    for index in range(start, stop):
+        listing_index = index % plan.listings
+        seller = _listing_seller(plan, listing_index)
+        slot = index // plan.listings
+        # the first subscriber of each listing is its seller, like in the UI
+        user = seller if slot == 0 else _other_user(
+            plan, "subscription-user", seller, slot - 1, listing_index
+        )
+        rows.append(
+            LuggageTelegramSubscription(
+                user_id=_uuid(plan, "user", user),
+                listing_id=_uuid(plan, "listing", listing_index),
+                notify_on_new_reservation=rng.random() < 0.9,
+                notify_on_status_change=rng.random() < 0.9,
+                notify_on_sold_out=rng.random() < 0.9,
+                notify_on_reopened=rng.random() < 0.9,
+                is_active=rng.random() < 0.8,
+            )
+        )
+    return LuggageTelegramSubscription, rows
+
+
+BUILDERS = {
+    "users": build_users,
+    "requests": build_requests,
+    "conversations": build_conversations,
+    "messages": build_messages,
+    "listings": build_listings,
+    "reservations": build_reservations,
+    "subscriptions": build_subscriptions,
+}
+
+
+def insert_chunk(task):
+    kind, plan, start, stop = task
+    model, rows = BUILDERS[kind](plan, start, stop)
+    model.objects.bulk_create(rows, batch_size=len(rows), ignore_conflicts=True)
+    return stop - start
+
 
 class Command(BaseCommand):
-    help = """Creates dummy data for the application, including users, requests, 
-    conversations, and messages. This command is useful for testing and 
-    development purposes. You can customize the number of each type of data 
-    to be created using the following arguments:
-
-    Arguments:
-      --users: Number of dummy users to create (default: 50).
-      --requests: Number of dummy requests to create (default: 200).
-      --conversations: Approximate number of dummy conversations to create (default: 300).
-      --messages: Approximate number of dummy messages to create (default: 2000).
-      --password: Default password for dummy users (default: '6p2VLY94O53sgDfZwo0HbvCUmiJWhSAzXdj').
+    help = """Creates dummy data for the application: users (some Telegram-linked),
+    money requests, conversations, messages, luggage listings, reservations and
+    Telegram subscriptions. Rows are built in batches and written with
+    bulk_create, so it scales to millions of rows for load testing.
+
+    Output is deterministic for a given --seed: every row is derived from
+    (seed, kind, index), so runs with the same seed produce the same ids and
+    re-running is a no-op for everything except messages. Use --workers to
+    insert batches from several processes (PostgreSQL; SQLite serializes
+    writers anyway).
     """
 
     # Add command-line arguments for customization
@@ -49,13 +325,37 @@ class Command(BaseCommand):
             "--conversations",
             type=int,
             default=300,
-            help="Approximate number of dummy conversations to create. Default: 300.",
+            help="Number of dummy conversations to create. Default: 300.",
         )
         parser.add_argument(
             "--messages",
             type=int,
             default=2000,
-            help="Approximate number of dummy messages to create. Default: 2000.",
+            help="Number of dummy messages to create. Default: 2000.",
+        )
+        parser.add_argument(
+            "--listings",
+            type=int,
+            default=100,
+            help="Number of dummy luggage listings to create. Default: 100.",
+        )
+        parser.add_argument(
+            "--reservations",
+            type=int,
+            default=300,
+            help="Number of dummy luggage reservations to create. Default: 300.",
+        )
+        parser.add_argument(
+            "--subscriptions",
+            type=int,
+            default=200,
+            help="Number of dummy luggage Telegram subscriptions to create. Default: 200.",
+        )
+        parser.add_argument(
+            "--telegram-ratio",
+            type=float,
+            default=0.3,
+            help="Share of users with a linked Telegram chat. Default: 0.3.",
         )
         parser.add_argument(
             "--password",
@@ -63,210 +363,113 @@ class Command(BaseCommand):
             default="6p2VLY94O53sgDfZwo0HbvCUmiJWhSAzXdj",
             help="Default password for dummy users. Default: '6p2VLY94O53sgDfZwo0HbvCUmiJWhSAzXdj'.",
         )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=42,
+            help="Seed for deterministic output. Default: 42.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows per bulk_create batch. Default: 5000.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Worker processes inserting batches in parallel. Default: 1.",
+        )
 
-    @transaction.atomic  # Wrap in a transaction for efficiency and atomicity
-    def handle(self, *args, **options):
-        num_users = options["users"]
-        num_requests = options["requests"]
-        num_conversations = options["conversations"]
-        num_messages = options["messages"]
-        default_password = options["password"]
+    def _capacity_checks(self, plan: Plan):
+        if plan.users < 2:
+            raise CommandError("At least 2 users are needed.")
+        limits = {
+            "conversations": (plan.requests, plan.requests * (plan.users - 1)),
+            "messages": (plan.conversations, None),
+            "reservations": (plan.listings, plan.listings * (plan.users - 1)),
+            "subscriptions": (plan.listings, plan.listings * plan.users),
+        }
+        for kind, (parents, maximum) in limits.items():
+            count = getattr(plan, kind)
+            if count and not parents:
+                raise CommandError(f"Cannot create {kind} without their parent rows.")
+            if maximum is not None and count > maximum:
+                raise CommandError(
+                    f"At most {maximum} unique {kind} fit these user/parent counts."
+                )
 
-        fake = Faker()  # Initialize Faker
+    def handle(self, *args, **options):
+        plan = Plan(
+            seed=options["seed"],
+            users=options["users"],
+            requests=options["requests"],
+            conversations=options["conversations"],
+            messages=options["messages"],
+            listings=options["listings"],
+            reservations=options["reservations"],
+            subscriptions=options["subscriptions"],
+            telegram_ratio=options["telegram_ratio"],
+            # hashing is deliberately slow; do it once and share the hash
+            password_hash=make_password(options["password"]),
+            rates=rates.latest_rates(),
+            now=timezone.now(),
+        )
+        self._capacity_checks(plan)
+        batch_size = max(1, options["batch_size"])
+        workers = max(1, options["workers"])
 
         self.stdout.write(self.style.SUCCESS("Starting dummy data creation..."))
-
-        # === 1. Create Users ===
-        self.stdout.write(f"Creating {num_users} users...")
-        users = []
-        for i in range(num_users):
-            # username = f"testuser_{i+1}"
-            username = fake.user_name()  # Generate a random username
-            email = fake.email()
-            try:
-                user = User.objects.create_user(
-                    username=username, email=email, password=default_password
-                )
-                # Add other user profile fields if you have them
-                # user.profile.full_name = fake.name()
-                # user.profile.save()
-                users.append(user)
-                if (i + 1) % 10 == 0:
-                    self.stdout.write(f"...created {i+1}/{num_users} users.")
-            except IntegrityError:
+        started = time.monotonic()
+
+        pool = None
+        if workers > 1:
+            # children must open their own connections, not share the parent's socket
+            connections.close_all()
+            pool = multiprocessing.get_context("fork").Pool(workers)
+
+        try:
+            for kind in BUILDERS:
+                total = getattr(plan, kind)
+                if not total:
+                    continue
+                phase_started = time.monotonic()
+                tasks = [
+                    (kind, plan, start, min(start + batch_size, total))
+                    for start in range(0, total, batch_size)
+                ]
+                if pool:
+                    results = pool.imap_unordered(insert_chunk, tasks)
+                else:
+                    results = map(insert_chunk, tasks)
+                done = 0
+                for count in results:
+                    done += count
+                    self.stdout.write(f"...created {done}/{total} {kind}.")
+                elapsed = time.monotonic() - phase_started
                 self.stdout.write(
-                    self.style.WARNING(
-                        f"User {username} likely already exists, skipping."
+                    self.style.SUCCESS(
+                        f"Created {total} {kind} in {elapsed:.1f}s "
+                        f"({total / max(elapsed, 1e-9):,.0f} rows/s)."
                     )
                 )
-                # Try to fetch the existing user if needed for subsequent steps
-                try:
-                    users.append(User.objects.get(username=username))
-                except User.DoesNotExist:
-                    pass  # Should not happen if IntegrityError was due to username
-
-        if not users:
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+
+        if plan.conversations:
+            # bulk_create skips the signal that creates memberships
+            result = backfill_read_pointers(batch_size=batch_size)
             self.stdout.write(
-                self.style.ERROR(
-                    "No users available. Cannot create requests/conversations."
+                self.style.SUCCESS(
+                    f"Created read pointers for {result.conversations} conversations."
                 )
             )
-            return
-
-        self.stdout.write(
-            self.style.SUCCESS(f"Successfully created/found {len(users)} users.")
-        )
-
-        # === 2. Create Requests ===
-        self.stdout.write(f"Creating {num_requests} requests...")
-        requests = []
-        active_requests = []  # Keep track of active ones for conversations
-        type_choices = [choice[0] for choice in Request.TYPE_CHOICES]
-        currency_choices = [choice[0] for choice in Request.CURRENCY_CHOICES]
-        status_choices = [choice[0] for choice in Request.STATUS_CHOICES]
-
-        for i in range(num_requests):
-            request_user = random.choice(users)
-            req_type = random.choice(type_choices)
-            currency = random.choice(currency_choices)
-            amount = Decimal(random.randint(1000, 1000000))
-            deadline = timezone.now() + timedelta(
-                days=random.randint(1, 90), hours=random.randint(1, 23)
-            )
-            # Make ~20% completed, the rest active
-            status = "completed" if random.random() < 0.2 else "active"
-            urgent = random.choice([True, False])
-            hide_contacts = random.choice([True, False])
-            conditions = (
-                fake.sentence() if random.random() < 0.5 else ""
-            )  # ~50% have conditions
-
-            req = Request.objects.create(
-                user=request_user,
-                type=req_type,
-                amount=amount,
-                currency=currency,
-                deadline=deadline,
-                urgent=urgent,
-                conditions=conditions,
-                status=status,
-                hide_contacts=hide_contacts,
-            )
-            requests.append(req)
-            if status == "active":
-                active_requests.append(req)
-
-            if (i + 1) % 20 == 0:
-                self.stdout.write(f"...created {i+1}/{num_requests} requests.")
 
         self.stdout.write(
             self.style.SUCCESS(
-                f"Successfully created {len(requests)} requests ({len(active_requests)} active)."
+                f"Dummy data creation complete in {time.monotonic() - started:.1f}s!"
             )
         )
-
-        if not active_requests:
-            self.stdout.write(
-                self.style.WARNING(
-                    "No active requests created. Cannot create conversations."
-                )
-            )
-            # Continue to message creation if needed, though they won't make sense
-        else:
-            # === 3. Create Conversations ===
-            self.stdout.write(
-                f"Attempting to create up to {num_conversations} conversations..."
-            )
-            conversations = []
-            attempts = 0
-            max_attempts = (
-                num_conversations * 3
-            )  # Allow for failures due to user collision/existing
-
-            while len(conversations) < num_conversations and attempts < max_attempts:
-                attempts += 1
-                request_obj = random.choice(active_requests)
-                request_owner = request_obj.user
-                possible_participants = [u for u in users if u != request_owner]
-
-                if not possible_participants:
-                    continue  # Skip if only one user exists
-
-                other_participant = random.choice(possible_participants)
-
-                # Ensure consistent participant order for unique_together
-                p1 = min(request_owner, other_participant, key=lambda u: u.pk)
-                p2 = max(request_owner, other_participant, key=lambda u: u.pk)
-
-                try:
-                    # Use get_or_create to handle potential duplicates gracefully
-                    conversation, created = Conversation.objects.get_or_create(
-                        request=request_obj,
-                        participant1=p1,
-                        participant2=p2,
-                    )
-                    if created:
-                        conversations.append(conversation)
-                        if len(conversations) % 25 == 0:
-                            self.stdout.write(
-                                f"...created {len(conversations)}/{num_conversations} conversations."
-                            )
-
-                except IntegrityError:
-                    # This might happen with race conditions if not using get_or_create,
-                    # but get_or_create should handle it. Log just in case.
-                    self.stdout.write(
-                        self.style.WARNING(
-                            "Integrity error during conversation creation (should be rare with get_or_create)."
-                        )
-                    )
-                    pass
-
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f"Successfully created {len(conversations)} conversations."
-                )
-            )
-
-            # === 4. Create Messages ===
-            # Fetch all conversations created or found previously
-            all_conversations = list(Conversation.objects.filter(request__in=requests))
-
-            if not all_conversations:
-                self.stdout.write(
-                    self.style.WARNING(
-                        "No conversations available to create messages for."
-                    )
-                )
-            else:
-                self.stdout.write(f"Creating {num_messages} messages...")
-                messages_created_count = 0
-                for i in range(num_messages):
-                    conversation_obj = random.choice(all_conversations)
-                    sender = random.choice(
-                        [conversation_obj.participant1, conversation_obj.participant2]
-                    )
-                    content = fake.sentence(nb_words=random.randint(5, 25))
-                    # Simulate read status - maybe older messages are more likely read
-                    # For simplicity, let's just make ~70% read
-                    is_read = random.random() < 0.7
-
-                    # Create message (auto_now_add handles timestamp)
-                    Message.objects.create(
-                        conversation=conversation_obj,
-                        sender=sender,
-                        content=content,
-                        is_read=is_read,
-                    )
-                    messages_created_count += 1
-
-                    if (i + 1) % 100 == 0:
-                        self.stdout.write(f"...created {i+1}/{num_messages} messages.")
-
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f"Successfully created {messages_created_count} messages."
-                    )
-                )
-
-        self.stdout.write(self.style.SUCCESS("Dummy data creation complete!"))
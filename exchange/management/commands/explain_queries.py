@@ -0,0 +1,163 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+
+from exchange.models import (
+    Conversation,
+    LuggageListing,
+    LuggageReservation,
+    LuggageTelegramSubscription,
+    Message,
+    Request,
+)
+
+
+def _sample(model, **filters):
+    return model.objects.filter(**filters).order_by().first()
+
+
+def hot_queries():
+    """The main query of each hot view, built the same way the view builds it.
+
+    Each entry is ``(name, table, queryset or None)``; ``None`` means the table
+    has no rows to pick sample parameters from.
+    """
+    listing = _sample(LuggageListing)
+    user = listing.seller if listing else None
+    conversation = _sample(Conversation)
+
+    return [
+        (
+            "home: active offers by type",
+            Request._meta.db_table,
+            Request.objects.filter(type="send", status="active").order_by("-created_at"),
+        ),
+        (
+            "my offers",
+            Request._meta.db_table,
+            user and Request.objects.filter(user=user).order_by("-created_at"),
+        ),
+        (
+            "marketplace: newest open listings",
+            LuggageListing._meta.db_table,
+            LuggageListing.objects.filter(is_active=True).order_by("-created_at"),
+        ),
+        (
+            "marketplace: sort by price",
+            LuggageListing._meta.db_table,
+            LuggageListing.objects.filter(is_active=True).order_by("price_per_kg_base"),
+        ),
+        (
+            "listing detail: committed kg",
+            LuggageReservation._meta.db_table,
+            listing
+            and LuggageReservation.objects.filter(
+                listing=listing,
+                status__in=[
+                    LuggageReservation.STATUS_PENDING,
+                    LuggageReservation.STATUS_RESERVED,
+                ],
+            ).order_by(),
+        ),
+        (
+            "notifications: listing subscribers",
+            LuggageTelegramSubscription._meta.db_table,
+            listing
+            and LuggageTelegramSubscription.objects.filter(
+                listing=listing, is_active=True
+            ).order_by(),
+        ),
+        (
+            "header: unread messages",
+            Message._meta.db_table,
+            conversation
+            and Message.unread_for(conversation.participant1).order_by(),
+        ),
+        (
+            "conversation: messages",
+            Message._meta.db_table,
+            conversation and conversation.messages.all(),
+        ),
+        (
+            "sweeper: offers past deadline",
+            Request._meta.db_table,
+            Request.objects.filter(
+                status="active", deadline__lt=models.functions.Now()
+            ).order_by(),
+        ),
+        (
+            "sweeper: expired pending holds",
+            LuggageReservation._meta.db_table,
+            LuggageReservation.objects.filter(
+                status=LuggageReservation.STATUS_PENDING,
+                created_at__lt=models.functions.Now(),
+            ).order_by(),
+        ),
+    ]
+
+
+def uses_sequential_scan(plan: str, table: str) -> bool:
+    if connection.vendor == "postgresql":
+        return bool(re.search(rf"Seq Scan on {re.escape(table)}\b", plan))
+    if connection.vendor == "sqlite":
+        return any(
+            re.search(rf"\bSCAN {re.escape(table)}\b", line) and "USING" not in line
+            for line in plan.splitlines()
+        )
+    return False
+
+
+class Command(BaseCommand):
+    help = """Run EXPLAIN on the main query of each hot view and report whether it
+    is answered from an index. Seed data first (e.g. create_dummy_data); use
+    --strict in CI to fail when any query falls back to a sequential scan."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--strict",
+            action="store_true",
+            help="Exit with an error if any query uses a sequential scan.",
+        )
+        parser.add_argument(
+            "--allow-seqscan",
+            action="store_true",
+            help=(
+                "PostgreSQL only: let the planner pick sequential scans. By default "
+                "they are disabled so small seeded tables still show which index "
+                "would be used."
+            ),
+        )
+        parser.add_argument(
+            "--show-plans",
+            action="store_true",
+            help="Print the full plan of every query.",
+        )
+
+    def handle(self, *args, **options):
+        failures = []
+        with transaction.atomic():
+            if connection.vendor == "postgresql" and not options["allow_seqscan"]:
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+
+            for name, table, queryset in hot_queries():
+                if queryset is None:
+                    self.stdout.write(self.style.WARNING(f"SKIP  {name}: no sample rows"))
+                    continue
+
+                plan = queryset.explain()
+                if uses_sequential_scan(plan, table):
+                    failures.append(name)
+                    self.stdout.write(self.style.ERROR(f"SCAN  {name}"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"INDEX {name}"))
+                if options["show_plans"]:
+                    self.stdout.write(plan + "\n")
+
+            transaction.set_rollback(True)
+
+        if failures and options["strict"]:
+            raise CommandError(
+                f"{len(failures)} queries use a sequential scan: {', '.join(failures)}"
+            )
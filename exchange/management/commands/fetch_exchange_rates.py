@@ -0,0 +1,43 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from exchange.rates import get_rates_provider, store_rates
+
+
+class Command(BaseCommand):
+    help = "Fetch the latest JPY/UZS/USD exchange rates and store them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--provider",
+            help="Dotted path of a rates provider class. Defaults to EXCHANGE_RATES_PROVIDER.",
+        )
+        parser.add_argument(
+            "--no-reprice",
+            action="store_true",
+            help="Do not recompute normalized listing prices after storing the rates.",
+        )
+
+    def handle(self, *args, **options):
+        provider = (
+            import_string(options["provider"])()
+            if options["provider"]
+            else get_rates_provider()
+        )
+
+        try:
+            rates = provider.fetch()
+        except Exception as exc:
+            raise CommandError(f"Could not fetch exchange rates: {exc}") from exc
+
+        if not rates:
+            raise CommandError("Rates provider returned no rates.")
+
+        store_rates(rates, source=getattr(provider, "name", provider.__class__.__name__))
+        for currency, rate in sorted(rates.items()):
+            self.stdout.write(f"1 USD = {rate} {currency}")
+        self.stdout.write(self.style.SUCCESS(f"Stored {len(rates)} exchange rates."))
+
+        if not options["no_reprice"]:
+            call_command("reprice_listings", stdout=self.stdout, stderr=self.stderr)
@@ -0,0 +1,304 @@
+import json
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from exchange.benchmarking import (
+    SELLER_CHAT_ID,
+    ensure_fixtures,
+    ensure_load_users,
+    http_call,
+    percentile,
+    session_cookies,
+    webhook_payload,
+)
+from exchange.fake_telegram import FakeTelegramServer
+
+DEFAULT_MIX = "browse=60,reserve=15,chat=20,webhook=5"
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("browse", "reserve", "chat", "webhook"):
+            raise CommandError(f"Unknown action in --mix: {name!r}")
+        try:
+            mix[name] = float(weight)
+        except ValueError as exc:
+            raise CommandError(f"Invalid weight for {name!r} in --mix") from exc
+    if not any(mix.values()):
+        raise CommandError("--mix needs at least one positive weight.")
+    return mix
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, harness, user, conversation, cookies, rng):
+        super().__init__(daemon=True)
+        self.harness = harness
+        self.username = user.username
+        self.chat_id = user.telegram_chat_id
+        self.conversation_path = reverse(
+            "conversation", kwargs={"conversation_id": conversation.id}
+        )
+        self.cookies = cookies
+        self.rng = rng
+
+    def request(self, label, method, path, data=None, headers=None, cookies=None):
+        started = time.perf_counter()
+        try:
+            status = http_call(
+                self.harness.base_url,
+                method,
+                path,
+                cookies=self.cookies if cookies is None else cookies,
+                data=data,
+                headers=headers,
+            )
+        except Exception:
+            status = 0
+        self.harness.record(label, status, (time.perf_counter() - started) * 1000)
+        return status
+
+    def browse(self):
+        path = self.rng.choice(
+            [self.harness.paths["home"], self.harness.paths["marketplace"], self.harness.paths["detail"]]
+        )
+        self.request("browse", "GET", path)
+
+    def reserve(self):
+        self.harness.expect_notification(self.username, time.time())
+        self.request(
+            "reserve",
+            "POST",
+            self.harness.paths["reserve"],
+            data={"kg_requested": "0.01", "contact_handle": "", "note": "load test"},
+        )
+
+    def chat(self):
+        self.request(
+            "chat_send",
+            "POST",
+            self.conversation_path,
+            data={"content": f"load test message {self.rng.random():.6f}"},
+        )
+        self.request("chat_read", "GET", self.conversation_path)
+
+    def webhook(self):
+        self.request(
+            "webhook",
+            "POST",
+            self.harness.paths["webhook"],
+            data=webhook_payload(self.chat_id, "/status"),
+            headers=self.harness.webhook_headers,
+            cookies={},
+        )
+
+    def run(self):
+        actions = list(self.harness.mix)
+        weights = [self.harness.mix[name] for name in actions]
+        while time.monotonic() < self.harness.deadline:
+            getattr(self, self.rng.choices(actions, weights)[0])()
+            if self.harness.think_ms:
+                time.sleep(self.rng.uniform(0, 2 * self.harness.think_ms) / 1000)
+
+
+class Command(BaseCommand):
+    help = """Concurrent load test against a running server: simulated users browse,
+    reserve luggage space, chat and send Telegram webhook traffic while a stub
+    Bot API records notification deliveries.
+
+    Start the server with the stub as its Telegram API, for example:
+
+        TELEGRAM_BOT_TOKEN=load TELEGRAM_API_BASE_URL=http://127.0.0.1:8081 \\
+            gunicorn base.wsgi -w 4
+
+    then run: python manage.py loadtest --base-url http://127.0.0.1:8000"""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", required=True, help="Server under test.")
+        parser.add_argument(
+            "--users", type=int, default=20, help="Concurrent virtual users. Default: 20."
+        )
+        parser.add_argument(
+            "--duration", type=float, default=30, help="Test length in seconds. Default: 30."
+        )
+        parser.add_argument(
+            "--mix",
+            default=DEFAULT_MIX,
+            help=f"Action weights. Default: {DEFAULT_MIX}.",
+        )
+        parser.add_argument(
+            "--think-ms",
+            type=float,
+            default=0,
+            help="Mean pause between actions of one user, in ms. Default: 0.",
+        )
+        parser.add_argument(
+            "--stub-port",
+            type=int,
+            default=8081,
+            help="Port of the stub Telegram Bot API. Default: 8081.",
+        )
+        parser.add_argument(
+            "--stub-latency-ms",
+            type=float,
+            default=0,
+            help="Latency the stub adds to every Bot API call. Default: 0.",
+        )
+        parser.add_argument(
+            "--stub-429-ratio",
+            type=float,
+            default=0,
+            help="Share of sendMessage calls answered with 429. Default: 0.",
+        )
+        parser.add_argument(
+            "--drain",
+            type=float,
+            default=5,
+            help="Seconds to wait for late notifications after the test. Default: 5.",
+        )
+        parser.add_argument("--seed", type=int, default=1, help="Random seed. Default: 1.")
+        parser.add_argument("--output", help="Write the report JSON to this path.")
+
+    # -- bookkeeping shared by the worker threads --
+
+    def record(self, label, status, latency_ms):
+        with self.lock:
+            self.samples[label].append((status, latency_ms))
+
+    def expect_notification(self, username, sent_at):
+        with self.lock:
+            self.pending_notifications[username].append(sent_at)
+
+    def handle(self, *args, **options):
+        self.base_url = options["base_url"].rstrip("/")
+        self.mix = parse_mix(options["mix"])
+        self.think_ms = options["think_ms"]
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.pending_notifications = defaultdict(deque)
+
+        fixtures = ensure_fixtures()
+        load_users = ensure_load_users(fixtures, options["users"])
+        self.paths = {
+            "home": reverse("home"),
+            "marketplace": reverse("luggage_marketplace"),
+            "detail": reverse("luggage_listing_detail", kwargs={"listing_id": fixtures.listing.id}),
+            "reserve": reverse("luggage_reserve", kwargs={"listing_id": fixtures.listing.id}),
+            "webhook": reverse("telegram_webhook"),
+        }
+        self.webhook_headers = {"Content-Type": "application/json"}
+        secret = getattr(settings, "TELEGRAM_WEBHOOK_SECRET", "") or ""
+        if secret:
+            self.webhook_headers["X-Telegram-Bot-Api-Secret-Token"] = secret
+
+        stub = FakeTelegramServer(
+            ("127.0.0.1", options["stub_port"]),
+            latency_ms=options["stub_latency_ms"],
+            rate_limit_ratio=options["stub_429_ratio"],
+        ).start()
+        self.stdout.write(
+            f"Stub Bot API listening on {stub.base_url}; the server under test needs "
+            f"TELEGRAM_API_BASE_URL={stub.base_url} and a TELEGRAM_BOT_TOKEN."
+        )
+
+        rng = random.Random(options["seed"])
+        workers = [
+            VirtualUser(self, user, conversation, session_cookies(user), random.Random(rng.random()))
+            for user, conversation in load_users
+        ]
+
+        self.stdout.write(
+            f"Running {len(workers)} users for {options['duration']:.0f}s against {self.base_url}..."
+        )
+        started = time.monotonic()
+        self.deadline = started + options["duration"]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.monotonic() - started
+
+        time.sleep(options["drain"])
+        stub.stop()
+
+        report = self._report(elapsed, stub.snapshot())
+        self._print(report)
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2) + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+    def _report(self, elapsed, deliveries):
+        actions = {}
+        total = errors = 0
+        for label, samples in sorted(self.samples.items()):
+            latencies = [latency for _status, latency in samples]
+            failed = sum(1 for status, _latency in samples if not status or status >= 400)
+            total += len(samples)
+            errors += failed
+            actions[label] = {
+                "requests": len(samples),
+                "throughput_rps": round(len(samples) / elapsed, 2),
+                "error_rate": round(failed / len(samples), 4),
+                "p50_ms": round(percentile(latencies, 0.5), 2),
+                "p95_ms": round(percentile(latencies, 0.95), 2),
+            }
+
+        # match reservation notifications to the seller with the POSTs, FIFO per buyer
+        lags = []
+        for delivery in deliveries:
+            if delivery.rate_limited or delivery.chat_id != SELLER_CHAT_ID:
+                continue
+            if "New reservation" not in delivery.text:
+                continue
+            username = delivery.text.rsplit(" by ", 1)[-1].rstrip(".")
+            queue = self.pending_notifications.get(username)
+            if queue:
+                lags.append((delivery.received_at - queue.popleft()) * 1000)
+        undelivered = sum(len(queue) for queue in self.pending_notifications.values())
+
+        return {
+            "duration_s": round(elapsed, 2),
+            "requests": total,
+            "throughput_rps": round(total / elapsed, 2),
+            "error_rate": round(errors / total, 4) if total else 0,
+            "actions": actions,
+            "notifications": {
+                "deliveries": len(deliveries),
+                "rate_limited": sum(1 for delivery in deliveries if delivery.rate_limited),
+                "reservation_notifications": len(lags),
+                "missing": undelivered,
+                "lag_p50_ms": round(percentile(lags, 0.5), 2),
+                "lag_p95_ms": round(percentile(lags, 0.95), 2),
+                "lag_mean_ms": round(statistics.fmean(lags), 2) if lags else 0,
+            },
+        }
+
+    def _print(self, report):
+        self.stdout.write("")
+        for label, result in report["actions"].items():
+            self.stdout.write(
+                f"{label:<10} {result['requests']:>7} req  {result['throughput_rps']:>8.1f} req/s  "
+                f"p50 {result['p50_ms']:>8.1f}ms  p95 {result['p95_ms']:>8.1f}ms  "
+                f"errors {result['error_rate']:.2%}"
+            )
+        notifications = report["notifications"]
+        self.stdout.write(
+            f"\nTotal: {report['requests']} requests in {report['duration_s']}s "
+            f"({report['throughput_rps']} req/s), errors {report['error_rate']:.2%}"
+        )
+        self.stdout.write(
+            f"Telegram: {notifications['deliveries']} deliveries "
+            f"({notifications['rate_limited']} answered 429), reservation notification "
+            f"lag p50 {notifications['lag_p50_ms']}ms / p95 {notifications['lag_p95_ms']}ms, "
+            f"{notifications['missing']} missing"
+        )
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from exchange.rates import base_currency, latest_rates, reprice_listings
+
+
+class Command(BaseCommand):
+    help = "Recompute the normalized price_per_kg_base of every luggage listing."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of listings updated per UPDATE statement. Default: 1000.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        rates = latest_rates()
+        self.stdout.write(f"Repricing listings into {base_currency()}...")
+
+        total = 0
+        for total in reprice_listings(chunk_size=options["chunk_size"], rates=rates):
+            self.stdout.write(f"...repriced {total} listings.")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"Repriced {total} listings in {elapsed:.2f}s.")
+        )
@@ -4,6 +4,8 @@ from urllib import error, parse, request
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 
+from exchange.telegram import api_base_url
+
 
 class Command(BaseCommand):
     help = "Configure Telegram bot webhook URL."
@@ -11,7 +13,7 @@ class Command(BaseCommand):
     def _telegram_post(self, token: str, method: str, data: dict | None = None) -> dict:
         payload = parse.urlencode(data or {}).encode("utf-8")
         req = request.Request(
-            url=f"https://api.telegram.org/bot{token}/{method}",
+            url=f"{api_base_url()}/bot{token}/{method}",
             data=payload,
             headers={"Content-Type": "application/x-www-form-urlencoded"},
             method="POST",
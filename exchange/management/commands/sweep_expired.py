@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from exchange.expiry import sweep_expired
+
+
+class Command(BaseCommand):
+    help = """Close expired luggage listings, cancel pending reservations held
+    longer than LUGGAGE_PENDING_HOLD_HOURS, complete offers past their
+    deadline and delete expired redeemed Telegram link tokens, in batched
+    UPDATE/DELETE statements. Run it from cron, or keep it running with
+    --loop."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Rows touched per UPDATE/DELETE statement. Default: 500.",
+        )
+        parser.add_argument(
+            "--no-notify",
+            action="store_true",
+            help="Do not send Telegram notifications for swept rows.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep sweeping every --interval seconds instead of exiting.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=300,
+            help="Seconds between sweeps when running with --loop. Default: 300.",
+        )
+
+    def _progress(self, result):
+        if self.verbosity > 1:
+            self.stdout.write(
+                f"...{result.name}: {result.count} rows in {result.batches} batches"
+            )
+
+    def _run_once(self, options):
+        started = time.monotonic()
+        results = sweep_expired(
+            batch_size=options["batch_size"],
+            notify=not options["no_notify"],
+            progress=self._progress,
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result.name}: {result.count} rows, {result.batches} batches, "
+                f"{result.seconds:.2f}s"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Sweep finished in {time.monotonic() - started:.2f}s.")
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        if not options["loop"]:
+            self._run_once(options)
+            return
+
+        while True:
+            close_old_connections()
+            try:
+                self._run_once(options)
+            except Exception as exc:
+                self.stderr.write(self.style.ERROR(f"Sweep failed: {exc}"))
+            time.sleep(options["interval"])
@@ -0,0 +1,93 @@
+"""Backfill of ConversationMembership read pointers from ``Message.is_read``.
+
+New conversations get their memberships from ``exchange.signals``; this fills
+in the rows for conversations created before the pointers existed, or written
+with ``bulk_create``. Everything before a participant's first unread incoming
+message counts as read. Existing memberships are never touched, so it is safe
+to re-run at any time.
+"""
+
+import time
+from dataclasses import dataclass
+
+from django.db.models import Exists, Max, Min, OuterRef, Q
+
+from exchange.models import Conversation, ConversationMembership, Message
+
+
+@dataclass
+class BackfillResult:
+    conversations: int = 0
+    memberships: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+
+def _pointer(stats, user_id) -> int:
+    """Last read message id for ``user_id`` from per-sender (last id, first unread id)."""
+    first_unread = [
+        unread
+        for sender_id, (_last, unread) in stats.items()
+        if sender_id != user_id and unread is not None
+    ]
+    if first_unread:
+        return min(first_unread) - 1
+    return max((last for last, _unread in stats.values()), default=0)
+
+
+def backfill_read_pointers(batch_size: int = 1000, progress=None) -> BackfillResult:
+    def missing(participant):
+        return ~Exists(
+            ConversationMembership.objects.filter(
+                conversation=OuterRef("pk"), user=OuterRef(participant)
+            )
+        )
+
+    queryset = (
+        Conversation.objects.filter(missing("participant1") | missing("participant2"))
+        .order_by("pk")
+        .values_list("pk", "participant1_id", "participant2_id")
+    )
+    result = BackfillResult()
+    started = time.monotonic()
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        conversations = list(chunk[:batch_size])
+        if not conversations:
+            break
+        last_pk = conversations[-1][0]
+
+        stats = {}
+        for row in (
+            Message.objects.filter(conversation_id__in=[pk for pk, _p1, _p2 in conversations])
+            .values("conversation_id", "sender_id")
+            .annotate(last_id=Max("id"), first_unread=Min("id", filter=Q(is_read=False)))
+            .order_by()
+        ):
+            stats.setdefault(row["conversation_id"], {})[row["sender_id"]] = (
+                row["last_id"],
+                row["first_unread"],
+            )
+
+        memberships = [
+            ConversationMembership(
+                conversation_id=pk,
+                user_id=user_id,
+                last_read_message_id=_pointer(stats.get(pk, {}), user_id),
+            )
+            for pk, p1, p2 in conversations
+            for user_id in {p1, p2}
+        ]
+        # rows that already exist are skipped, not overwritten
+        ConversationMembership.objects.bulk_create(memberships, ignore_conflicts=True)
+
+        result.conversations += len(conversations)
+        result.memberships += len(memberships)
+        result.batches += 1
+        if progress:
+            progress(result)
+        if len(conversations) < batch_size:
+            break
+    result.seconds = time.monotonic() - started
+    return result
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:52
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exchange', '0005_luggagelisting_price_currency'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(choices=[('JPY', 'Japanese Yen'), ('UZS', 'Uzbekistan Sum'), ('USD', 'US Dollar')], max_length=3)),
+                ('rate', models.DecimalField(decimal_places=6, max_digits=18)),
+                ('source', models.CharField(blank=True, max_length=32)),
+                ('fetched_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-fetched_at'],
+                'get_latest_by': 'fetched_at',
+                'indexes': [models.Index(fields=['currency', '-fetched_at'], name='exchange_rate_latest_idx')],
+            },
+        ),
+    ]
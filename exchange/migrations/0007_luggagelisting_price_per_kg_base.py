@@ -0,0 +1,72 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:53
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import migrations, models
+
+# A frozen copy of exchange.rates at the time of this migration, so later
+# changes to that module cannot change what the backfill computes.
+CURRENCIES = ("JPY", "UZS", "USD")
+DEFAULT_RATES = {"USD": Decimal("1"), "JPY": Decimal("150"), "UZS": Decimal("12700")}
+FACTOR_PRECISION = Decimal("1e-12")
+
+
+def backfill_price_per_kg_base(apps, schema_editor):
+    ExchangeRate = apps.get_model("exchange", "ExchangeRate")
+    LuggageListing = apps.get_model("exchange", "LuggageListing")
+
+    latest = dict(DEFAULT_RATES)
+    for currency in CURRENCIES:
+        rate = (
+            ExchangeRate.objects.filter(currency=currency)
+            .order_by("-fetched_at")
+            .values_list("rate", flat=True)
+            .first()
+        )
+        if rate:
+            latest[currency] = rate
+
+    base = getattr(settings, "EXCHANGE_BASE_CURRENCY", "USD") or "USD"
+    output_field = models.DecimalField(max_digits=20, decimal_places=6)
+    factor_field = models.DecimalField(max_digits=30, decimal_places=12)
+    LuggageListing.objects.update(
+        price_per_kg_base=models.Case(
+            *[
+                models.When(
+                    price_currency=currency,
+                    then=models.ExpressionWrapper(
+                        models.F("price_per_kg")
+                        * models.Value(
+                            (latest[base] / latest[currency]).quantize(FACTOR_PRECISION),
+                            output_field=factor_field,
+                        ),
+                        output_field=output_field,
+                    ),
+                )
+                for currency in CURRENCIES
+            ],
+            default=models.Value(None),
+            output_field=output_field,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exchange', '0006_exchangerate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='luggagelisting',
+            name='price_per_kg_base',
+            field=models.DecimalField(blank=True, decimal_places=6, editable=False, max_digits=20, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='luggagelisting',
+            index=models.Index(fields=['is_active', 'price_per_kg_base'], name='luggage_listing_price_idx'),
+        ),
+        migrations.RunPython(backfill_price_per_kg_base, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exchange', '0007_luggagelisting_price_per_kg_base'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='luggagelisting',
+            index=models.Index(fields=['is_active', 'available_until', '-created_at'], name='luggage_listing_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='luggagelisting',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='luggage_listing_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='luggagereservation',
+            index=models.Index(fields=['listing', 'status'], name='luggage_res_listing_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='luggagetelegramsubscription',
+            index=models.Index(fields=['listing', 'is_active'], name='luggage_sub_listing_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'timestamp'], name='message_conversation_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'is_read', 'sender'], name='message_read_state_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['conversation', 'sender'], name='message_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['type', 'status', '-created_at'], name='request_type_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['user', '-created_at'], name='request_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['deadline'], name='request_active_deadline_idx'),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 6.0.2 on 2026-10-19 15:15
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exchange', '0008_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='TelegramLinkToken',
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-19 15:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exchange', '0009_delete_telegramlinktoken'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LuggageWaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kg_requested', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('contact_handle', models.CharField(blank=True, max_length=120)),
+                ('note', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('buyer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='luggage_waitlist_entries', to=settings.AUTH_USER_MODEL)),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='exchange.luggagelisting')),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['listing', 'created_at', 'id'], name='luggage_waitlist_queue_idx')],
+                'constraints': [models.UniqueConstraint(fields=('listing', 'buyer'), name='luggage_waitlist_listing_buyer_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-19 15:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exchange', '0010_luggage_waitlist'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='luggagereservation',
+            index=models.Index(fields=['status', 'created_at'], name='luggage_res_status_created_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations
+from django.db.models import Exists, F, OuterRef
+
+
+def canonicalize(apps, schema_editor):
+    """Store participants in id order, merging conversations that then collide.
+
+    A conversation started from each side of the same offer existed twice
+    (participant order differed); its messages and read pointers move into the
+    already-ordered copy.
+    """
+    Conversation = apps.get_model("exchange", "Conversation")
+    ConversationMembership = apps.get_model("exchange", "ConversationMembership")
+    Message = apps.get_model("exchange", "Message")
+
+    reversed_order = Conversation.objects.filter(participant1__gt=F("participant2"))
+    twins = Conversation.objects.filter(
+        request=OuterRef("request"),
+        participant1=OuterRef("participant2"),
+        participant2=OuterRef("participant1"),
+    )
+    for duplicate in list(reversed_order.filter(Exists(twins))):
+        twin = Conversation.objects.get(
+            request_id=duplicate.request_id,
+            participant1_id=duplicate.participant2_id,
+            participant2_id=duplicate.participant1_id,
+        )
+        Message.objects.filter(conversation=duplicate).update(conversation=twin)
+        for membership in ConversationMembership.objects.filter(conversation=duplicate):
+            ConversationMembership.objects.filter(
+                conversation=twin,
+                user_id=membership.user_id,
+                last_read_message_id__lt=membership.last_read_message_id,
+            ).update(
+                last_read_message_id=membership.last_read_message_id,
+                last_read_at=membership.last_read_at,
+            )
+        duplicate.delete()
+
+    reversed_order.update(participant1=F("participant2"), participant2=F("participant1"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("exchange", "0012_conversation_membership"),
+    ]
+
+    operations = [
+        migrations.RunPython(canonicalize, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-19 15:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exchange', '0013_canonical_conversation_participants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='conversation',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.UniqueConstraint(fields=('request', 'participant1', 'participant2'), name='conversation_request_pair_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.CheckConstraint(condition=models.Q(('participant1__lte', models.F('participant2'))), name='conversation_participants_ordered'),
+        ),
+    ]
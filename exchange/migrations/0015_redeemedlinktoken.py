@@ -0,0 +1,20 @@
+# Generated by Django 6.0.2 on 2026-10-19 15:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exchange', '0014_conversation_canonical_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RedeemedLinkToken',
+            fields=[
+                ('key', models.CharField(max_length=72, primary_key=True, serialize=False)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -1,13 +1,46 @@
 from decimal import Decimal
-from django.db import models
+from django.db import connections, models, router, transaction
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 from django.db.models import Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from uuid import uuid4
 from django.contrib.humanize.templatetags.humanize import intcomma
 
+from exchange import rates
+
+
+class RequestQuerySet(models.QuerySet):
+    def with_potential_savings(self):
+        return self.annotate(potential_savings=rates.potential_savings_expression())
+
+
+class LuggageListingQuerySet(models.QuerySet):
+    def with_capacity(self):
+        """Annotate the totals behind committed_kg / reserved_kg / remaining_kg."""
+        zero = models.Value(
+            Decimal("0"), output_field=models.DecimalField(max_digits=12, decimal_places=2)
+        )
+        open_statuses = [LuggageReservation.STATUS_PENDING, LuggageReservation.STATUS_RESERVED]
+        return self.annotate(
+            committed_kg_total=Coalesce(
+                Sum(
+                    "reservations__kg_requested",
+                    filter=models.Q(reservations__status__in=open_statuses),
+                ),
+                zero,
+            ),
+            reserved_kg_total=Coalesce(
+                Sum(
+                    "reservations__kg_requested",
+                    filter=models.Q(reservations__status=LuggageReservation.STATUS_RESERVED),
+                ),
+                zero,
+            ),
+        )
+
 
 # Create your models here.
 class Request(models.Model):
@@ -39,6 +72,23 @@ class Request(models.Model):
         default=False, help_text=_("Hide contacts from other users")
     )
 
+    objects = RequestQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # home page and offer lists: WHERE type/status ORDER BY created_at DESC
+            models.Index(
+                fields=["type", "status", "-created_at"], name="request_type_status_idx"
+            ),
+            models.Index(fields=["user", "-created_at"], name="request_user_created_idx"),
+            # expiry sweeper: active offers past their deadline
+            models.Index(
+                fields=["deadline"],
+                condition=models.Q(status="active"),
+                name="request_active_deadline_idx",
+            ),
+        ]
+
     @property
     def amount_with_currency(self):
         return f"{intcomma(self.amount)} {self.get_currency_display()}"
@@ -47,9 +97,12 @@ class Request(models.Model):
         return f"{self.user.username} - {self.type} - {self.amount_with_currency}"
 
     def potential_savings_amount(self):
-        # for now, it is an approximate amount based on the amount
-        # this should be replaced with a real calculation based on the exchange rate
-        return int(self.amount * Decimal(0.03))  # 3% savings
+        # bank spread plus a flat transfer fee converted with the cached latest rates;
+        # querysets annotated with ``with_potential_savings()`` skip the Python math
+        annotated = getattr(self, "potential_savings", None)
+        if annotated is not None:
+            return int(annotated)
+        return rates.potential_savings(self.amount, self.currency)
 
 
 class Conversation(models.Model):
@@ -70,35 +123,166 @@ class Conversation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = ["request", "participant1", "participant2"]
+        constraints = [
+            # participants are stored in id order, so (request, pair) identifies a
+            # conversation whoever started it
+            models.UniqueConstraint(
+                fields=["request", "participant1", "participant2"],
+                name="conversation_request_pair_uniq",
+            ),
+            models.CheckConstraint(
+                condition=models.Q(participant1__lte=models.F("participant2")),
+                name="conversation_participants_ordered",
+            ),
+        ]
 
     def __str__(self):
         return f"Conversation between {self.participant1} and {self.participant2} about {self.request}"
 
+    @staticmethod
+    def ordered_pair(user_a_id, user_b_id) -> tuple:
+        # str() order of UUIDs matches the database's uuid order
+        return tuple(sorted((user_a_id, user_b_id), key=str))
+
+    def save(self, *args, **kwargs):
+        self.participant1_id, self.participant2_id = self.ordered_pair(
+            self.participant1_id, self.participant2_id
+        )
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def get_or_start(cls, request, user_a_id, user_b_id):
+        """``(conversation, created)`` for ``request`` between the two users.
+
+        ``INSERT ... ON CONFLICT DO NOTHING RETURNING`` adds the row, or
+        returns nothing when it exists; only then is it read by its canonical
+        key. A conflicting insert still in flight makes the INSERT wait for
+        it, so concurrent starts neither race nor raise IntegrityError, and
+        reopening an existing conversation writes nothing.
+        """
+        participant1_id, participant2_id = cls.ordered_pair(user_a_id, user_b_id)
+        connection = connections[router.db_for_write(cls)]
+        quote = connection.ops.quote_name
+        fields = [
+            cls._meta.get_field(name)
+            for name in ("id", "request", "participant1", "participant2", "created_at")
+        ]
+        values = [uuid4(), request.pk, participant1_id, participant2_id, timezone.now()]
+        columns = ", ".join(quote(field.column) for field in fields)
+        key = ", ".join(quote(field.column) for field in fields[1:4])
+        sql = (
+            f"INSERT INTO {quote(cls._meta.db_table)} ({columns}) "
+            f"VALUES ({', '.join(['%s'] * len(fields))}) "
+            f"ON CONFLICT ({key}) DO NOTHING "
+            f"RETURNING {columns}"
+        )
+        params = [
+            field.get_db_prep_value(value, connection) for field, value in zip(fields, values)
+        ]
+        with transaction.atomic(using=connection.alias):
+            conversation = next(iter(cls.objects.using(connection.alias).raw(sql, params)), None)
+            created = conversation is not None
+            if created:
+                # post_save does not fire for raw SQL
+                ConversationMembership.objects.using(connection.alias).bulk_create(
+                    [
+                        ConversationMembership(conversation=conversation, user_id=user_id)
+                        for user_id in {participant1_id, participant2_id}
+                    ]
+                )
+            else:
+                conversation = cls.objects.using(connection.alias).get(
+                    request=request,
+                    participant1_id=participant1_id,
+                    participant2_id=participant2_id,
+                )
+        return conversation, created
+
     @classmethod
     def get_user_conversations(cls, user):
+        # LEFT JOIN of the user's membership, so a conversation missing one
+        # (not backfilled yet) still lists, with every message unread
         return (
             cls.objects.filter(
                 models.Q(participant1=user) | models.Q(participant2=user)
             )
             .distinct()
             .annotate(
+                own_membership=models.FilteredRelation(
+                    "memberships", condition=models.Q(memberships__user=user)
+                ),
                 last_message=models.Max("messages__content"),
                 last_message_timestamp=models.Max("messages__timestamp"),
                 unread_count=models.Count(
-                    models.Case(
-                        models.When(
-                            models.Q(messages__is_read=False)
-                            & ~models.Q(messages__sender=user),
-                            then=models.Value(1),
-                        ),
-                        output_field=models.IntegerField(),
+                    "messages",
+                    filter=models.Q(
+                        messages__id__gt=Coalesce(
+                            "own_membership__last_read_message_id", models.Value(0)
+                        )
                     )
+                    & ~models.Q(messages__sender=user),
                 ),
             )
         )
 
 
+class ConversationMembership(models.Model):
+    """A participant's read state in a conversation.
+
+    Message ids grow with time, so everything up to ``last_read_message_id``
+    has been read and unread counts compare ids instead of flagging rows.
+    """
+
+    conversation = models.ForeignKey(
+        Conversation, on_delete=models.CASCADE, related_name="memberships"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="conversation_memberships",
+    )
+    # id of the newest message read, 0 before the first
+    last_read_message_id = models.BigIntegerField(default=0)
+    last_read_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["conversation", "user"], name="conversation_membership_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} in {self.conversation_id}"
+
+    @classmethod
+    def mark_read(cls, conversation, user, message_id) -> bool:
+        """Move the user's pointer up to ``message_id``; False if it already was there.
+
+        Creates the membership when it is missing (a conversation not
+        backfilled yet), so opening the conversation still clears it.
+        """
+
+        def advance():
+            return bool(
+                cls.objects.filter(
+                    conversation=conversation,
+                    user=user,
+                    last_read_message_id__lt=message_id,
+                ).update(last_read_message_id=message_id, last_read_at=timezone.now())
+            )
+
+        if advance():
+            return True
+        _membership, created = cls.objects.get_or_create(
+            conversation=conversation,
+            user=user,
+            defaults={"last_read_message_id": message_id, "last_read_at": timezone.now()},
+        )
+        # another request may have created it, with an older pointer, since the UPDATE
+        return created or advance()
+
+
 class Message(models.Model):
     conversation = models.ForeignKey(
         Conversation, on_delete=models.CASCADE, related_name="messages"
@@ -108,22 +292,49 @@ class Message(models.Model):
     )
     content = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
+    # Superseded by ConversationMembership.last_read_message_id and no longer
+    # written; only backfill_read_pointers reads it. To be dropped once that
+    # has run everywhere.
     is_read = models.BooleanField(default=False)
 
     class Meta:
         ordering = ["timestamp"]
+        indexes = [
+            models.Index(fields=["conversation", "timestamp"], name="message_conversation_ts_idx"),
+            # unread counts: messages of a conversation after the read pointer
+            models.Index(fields=["conversation", "id"], name="message_conversation_id_idx"),
+        ]
 
     def __str__(self):
         return self.content
 
+    @classmethod
+    def unread_for(cls, user):
+        """Messages to ``user`` newer than their read pointer, over all conversations.
+
+        Same LEFT JOIN as ``Conversation.get_user_conversations``: without a
+        membership every incoming message counts as unread.
+        """
+        return (
+            cls.objects.annotate(
+                own_membership=models.FilteredRelation(
+                    "conversation__memberships",
+                    condition=models.Q(conversation__memberships__user=user),
+                )
+            )
+            .filter(
+                models.Q(conversation__participant1=user)
+                | models.Q(conversation__participant2=user),
+                # the OR keeps the join outer; a comparison alone makes it INNER
+                models.Q(own_membership__isnull=True)
+                | models.Q(id__gt=models.F("own_membership__last_read_message_id")),
+            )
+            .exclude(sender=user)
+        )
+
     @classmethod
     def get_unread_message_count_by_user(cls, user):
-        return cls.objects.filter(
-            conversation__in=Conversation.objects.filter(
-                models.Q(participant1=user) | models.Q(participant2=user)
-            ),
-            is_read=False,
-        ).exclude(sender=user).count()
+        return cls.unread_for(user).count()
 
 
 class LuggageListing(models.Model):
@@ -143,6 +354,10 @@ class LuggageListing(models.Model):
     total_kg = models.DecimalField(max_digits=6, decimal_places=2)
     price_per_kg = models.DecimalField(max_digits=10, decimal_places=2)
     price_currency = models.CharField(max_length=3, choices=PRICE_CURRENCY_CHOICES, default="JPY")
+    # price_per_kg normalized to EXCHANGE_BASE_CURRENCY, refreshed in bulk by reprice_listings
+    price_per_kg_base = models.DecimalField(
+        max_digits=20, decimal_places=6, blank=True, null=True, editable=False
+    )
     available_until = models.DateField()
     arrival_datetime = models.DateTimeField(blank=True, null=True)
     departure_city = models.CharField(max_length=120, default="Tashkent")
@@ -156,20 +371,76 @@ class LuggageListing(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = LuggageListingQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["is_active", "price_per_kg_base"],
+                name="luggage_listing_price_idx",
+            ),
+            models.Index(
+                fields=["is_active", "available_until", "-created_at"],
+                name="luggage_listing_active_idx",
+            ),
+            # marketplace and home page: newest open listings first
+            models.Index(
+                fields=["-created_at"],
+                condition=models.Q(is_active=True),
+                name="luggage_listing_open_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.seller.username}"
 
+    def save(self, *args, **kwargs):
+        if self.price_per_kg is not None and self.price_currency:
+            self.price_per_kg_base = rates.convert(
+                self.price_per_kg, self.price_currency, rates.base_currency()
+            ).quantize(Decimal("0.000001"))
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "price_per_kg_base" not in update_fields:
+                kwargs["update_fields"] = {*update_fields, "price_per_kg_base"}
+        super().save(*args, **kwargs)
+
     def clean(self):
         if self.total_kg <= 0:
             raise ValidationError({"total_kg": _("Storage must be greater than 0 kg.")})
         if self.price_per_kg <= 0:
             raise ValidationError({"price_per_kg": _("Price per kg must be greater than 0.")})
 
+    def capacity_totals(self) -> dict:
+        """Committed and confirmed kg in one query (cached by ``exchange.cache``)."""
+        zero = models.Value(
+            Decimal("0"), output_field=models.DecimalField(max_digits=12, decimal_places=2)
+        )
+        return self.reservations.aggregate(
+            committed_kg_total=Coalesce(
+                Sum(
+                    "kg_requested",
+                    filter=models.Q(
+                        status__in=[
+                            LuggageReservation.STATUS_PENDING,
+                            LuggageReservation.STATUS_RESERVED,
+                        ]
+                    ),
+                ),
+                zero,
+            ),
+            reserved_kg_total=Coalesce(
+                Sum("kg_requested", filter=models.Q(status=LuggageReservation.STATUS_RESERVED)),
+                zero,
+            ),
+        )
+
     @property
     def committed_kg(self):
+        # totals set from capacity_totals() (or annotated) skip the query
+        annotated = getattr(self, "committed_kg_total", None)
+        if annotated is not None:
+            return annotated
         result = self.reservations.filter(
             status__in=[LuggageReservation.STATUS_PENDING, LuggageReservation.STATUS_RESERVED]
         ).aggregate(total=Sum("kg_requested"))
@@ -177,6 +448,9 @@ class LuggageListing(models.Model):
 
     @property
     def reserved_kg(self):
+        annotated = getattr(self, "reserved_kg_total", None)
+        if annotated is not None:
+            return annotated
         result = self.reservations.filter(
             status=LuggageReservation.STATUS_RESERVED
         ).aggregate(total=Sum("kg_requested"))
@@ -225,11 +499,32 @@ class LuggageReservation(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["listing", "status"], name="luggage_res_listing_status_idx"),
+            # pending hold sweep (exchange.expiry.cancel_expired_holds)
+            models.Index(fields=["status", "created_at"], name="luggage_res_status_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.buyer.username} - {self.kg_requested} kg ({self.status})"
 
     def clean(self):
+        self.validate_capacity(
+            lambda: self.listing.reservations.filter(
+                status__in=[self.STATUS_PENDING, self.STATUS_RESERVED]
+            )
+            .exclude(pk=self.pk)
+            .aggregate(total=Sum("kg_requested"))["total"]
+            or Decimal("0")
+        )
+
+    def validate_capacity(self, get_taken_kg):
+        """The rules of ``clean()``.
+
+        ``get_taken_kg`` returns the kg the listing's other open reservations
+        hold; batch updates pass totals computed once for the whole batch, and
+        None for a row leaving the open statuses, which takes no kg.
+        """
         if self.kg_requested <= 0:
             raise ValidationError({"kg_requested": _("Reserved kg must be greater than 0.")})
 
@@ -242,14 +537,10 @@ class LuggageReservation(models.Model):
         if self.listing.is_expired or not self.listing.is_active:
             raise ValidationError(_("This listing is no longer available."))
 
-        taken_kg = (
-            self.listing.reservations.filter(
-                status__in=[self.STATUS_PENDING, self.STATUS_RESERVED]
-            )
-            .exclude(pk=self.pk)
-            .aggregate(total=Sum("kg_requested"))["total"]
-            or Decimal("0")
-        )
+        if get_taken_kg is None:
+            return
+
+        taken_kg = get_taken_kg()
         remaining_for_new = self.listing.total_kg - taken_kg
         if self.kg_requested > remaining_for_new:
             raise ValidationError(
@@ -262,6 +553,42 @@ class LuggageReservation(models.Model):
             )
 
 
+class LuggageWaitlistEntry(models.Model):
+    """A buyer waiting for kg on a listing; promoted to a pending reservation
+    first come, first served by ``exchange.waitlist.promote``."""
+
+    listing = models.ForeignKey(
+        LuggageListing,
+        on_delete=models.CASCADE,
+        related_name="waitlist_entries",
+    )
+    buyer = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="luggage_waitlist_entries",
+    )
+    kg_requested = models.DecimalField(max_digits=6, decimal_places=2)
+    contact_handle = models.CharField(max_length=120, blank=True)
+    note = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["listing", "buyer"], name="luggage_waitlist_listing_buyer_uniq"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["listing", "created_at", "id"], name="luggage_waitlist_queue_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.buyer.username} waiting for {self.kg_requested} kg"
+
+
 class LuggageTelegramSubscription(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -284,25 +611,45 @@ class LuggageTelegramSubscription(models.Model):
     class Meta:
         unique_together = ["user", "listing"]
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["listing", "is_active"], name="luggage_sub_listing_active_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user} subscribed to {self.listing}"
 
 
-class TelegramLinkToken(models.Model):
-    user = models.ForeignKey(
-        settings.AUTH_USER_MODEL,
-        on_delete=models.CASCADE,
-        related_name="telegram_link_tokens",
-    )
-    token = models.CharField(max_length=64, unique=True)
-    created_at = models.DateTimeField(auto_now_add=True)
-    expires_at = models.DateTimeField()
-    used_at = models.DateTimeField(blank=True, null=True)
+class RedeemedLinkToken(models.Model):
+    """A redeemed Telegram connect token, kept until it expires to make it single-use.
+
+    The tokens themselves are signed and stateless (``exchange.telegram``).
+    ``key`` is the decoded payload and MAC in hex; the primary key makes a
+    second redemption fail in every worker. ``sweep_expired`` prunes the rows.
+    """
+
+    key = models.CharField(max_length=72, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.key
+
+
+class ExchangeRate(models.Model):
+    """One observed rate: units of ``currency`` per 1 USD at ``fetched_at``."""
+
+    CURRENCY_CHOICES = Request.CURRENCY_CHOICES
+
+    currency = models.CharField(max_length=3, choices=CURRENCY_CHOICES)
+    rate = models.DecimalField(max_digits=18, decimal_places=6)
+    source = models.CharField(max_length=32, blank=True)
+    fetched_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
-        ordering = ["-created_at"]
+        ordering = ["-fetched_at"]
+        get_latest_by = "fetched_at"
+        indexes = [
+            models.Index(fields=["currency", "-fetched_at"], name="exchange_rate_latest_idx"),
+        ]
 
-    @property
-    def is_valid(self):
-        return self.used_at is None and timezone.now() <= self.expires_at
+    def __str__(self):
+        return f"1 USD = {self.rate} {self.currency} ({self.fetched_at:%Y-%m-%d %H:%M})"
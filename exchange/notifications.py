@@ -1,8 +1,55 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
 from django.db.models import Q
 
-from exchange.models import LuggageTelegramSubscription
+from exchange.models import LuggageReservation, LuggageTelegramSubscription, Request
 from exchange.telegram import send_telegram_message
 
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.TELEGRAM_NOTIFY_WORKERS,
+                thread_name_prefix="telegram-notify",
+            )
+        return _executor
+
+
+def _run(func, args):
+    try:
+        func(*args)
+    except Exception:
+        logger.exception("Telegram notification %s failed", func.__name__)
+    finally:
+        # the worker thread's own connection
+        connection.close()
+
+
+def notify_later(func, *args):
+    """Call ``func(*args)`` on a background thread once the transaction commits.
+
+    With ``TELEGRAM_NOTIFY_WORKERS = 0`` it runs inline after commit instead.
+    """
+
+    def submit():
+        if settings.TELEGRAM_NOTIFY_WORKERS:
+            _get_executor().submit(_run, func, args)
+        else:
+            func(*args)
+
+    transaction.on_commit(submit)
+
 
 def notify_listing_subscribers(
     listing,
@@ -19,6 +66,8 @@ def notify_listing_subscribers(
         filters &= Q(notify_on_sold_out=True)
     elif event == "reopened":
         filters &= Q(notify_on_reopened=True)
+    elif event == "expired":
+        filters &= Q(notify_on_status_change=True)
 
     subscriptions = (
         LuggageTelegramSubscription.objects.select_related("user")
@@ -38,7 +87,150 @@ def notify_listing_subscribers(
         send_telegram_message(user.telegram_chat_id, message)
 
 
-def _build_message(listing, event: str, reservation=None, previous_status: str = "") -> str:
+def notify_reservation_batch(listing, changes, was_sold_out: bool, is_sold_out: bool):
+    """One message per subscriber for a batch of status changes.
+
+    ``changes`` holds ``(reservation, previous_status)`` pairs. Each subscriber
+    gets the parts they opted into: the status changes, and the sold out or
+    reopened transition the batch caused.
+    """
+    sold_out = not was_sold_out and is_sold_out
+    reopened = was_sold_out and not is_sold_out
+    filters = Q(notify_on_status_change=True)
+    if sold_out:
+        filters |= Q(notify_on_sold_out=True)
+    if reopened:
+        filters |= Q(notify_on_reopened=True)
+
+    subscriptions = (
+        LuggageTelegramSubscription.objects.select_related("user")
+        .filter(filters, is_active=True, listing=listing)
+    )
+
+    for subscription in subscriptions:
+        user = subscription.user
+        if not user.telegram_notifications_enabled or not user.telegram_chat_id:
+            continue
+        lines = []
+        if subscription.notify_on_status_change:
+            lines += [
+                f"🔄 {reservation.kg_requested}kg for {reservation.buyer.username} "
+                f"({previous_status} → {reservation.status})"
+                for reservation, previous_status in changes
+            ]
+        if sold_out and subscription.notify_on_sold_out:
+            lines.append("✅ This listing is now sold out.")
+        if reopened and subscription.notify_on_reopened:
+            lines.append("♻️ Space became available again.")
+        send_telegram_message(
+            user.telegram_chat_id,
+            _build_message(listing=listing, event="reservations_updated", lines=lines),
+        )
+
+
+def notify_waitlist_promoted(listing_id, reservation_ids):
+    """Tell promoted buyers, and subscribers following new reservations."""
+    reservations = list(
+        LuggageReservation.objects.select_related("listing", "buyer").filter(
+            id__in=reservation_ids
+        )
+    )
+    if not reservations:
+        return
+    listing = reservations[0].listing
+
+    for reservation in reservations:
+        buyer = reservation.buyer
+        if buyer.telegram_notifications_enabled and buyer.telegram_chat_id:
+            send_telegram_message(
+                buyer.telegram_chat_id,
+                _build_message(listing=listing, event="waitlist_promoted", reservation=reservation),
+            )
+
+    subscriptions = LuggageTelegramSubscription.objects.select_related("user").filter(
+        listing_id=listing_id,
+        is_active=True,
+        notify_on_new_reservation=True,
+        user__telegram_notifications_enabled=True,
+        user__telegram_chat_id__isnull=False,
+    )
+    lines = [
+        f"🆕 From the waitlist: {reservation.kg_requested}kg by {reservation.buyer.username}"
+        for reservation in reservations
+    ]
+    for subscription in subscriptions:
+        send_telegram_message(
+            subscription.user.telegram_chat_id,
+            _build_message(listing=listing, event="reservations_updated", lines=lines),
+        )
+
+
+def notify_listings_expired(listing_ids):
+    subscriptions = (
+        LuggageTelegramSubscription.objects.select_related("user", "listing")
+        .filter(
+            listing_id__in=listing_ids,
+            is_active=True,
+            notify_on_status_change=True,
+            user__telegram_notifications_enabled=True,
+            user__telegram_chat_id__isnull=False,
+        )
+    )
+
+    for subscription in subscriptions:
+        send_telegram_message(
+            subscription.user.telegram_chat_id,
+            _build_message(listing=subscription.listing, event="expired"),
+        )
+
+
+def notify_holds_expired(reservation_ids):
+    reservations = (
+        LuggageReservation.objects.select_related("buyer", "listing")
+        .filter(
+            pk__in=reservation_ids,
+            buyer__telegram_notifications_enabled=True,
+            buyer__telegram_chat_id__isnull=False,
+        )
+    )
+
+    for reservation in reservations:
+        send_telegram_message(
+            reservation.buyer.telegram_chat_id,
+            f"⌛ Your pending reservation of {reservation.kg_requested}kg on "
+            f"\"{reservation.listing.title}\" was not confirmed in time and was cancelled.",
+        )
+
+
+def notify_requests_expired(request_ids):
+    offers = (
+        Request.objects.select_related("user")
+        .filter(
+            pk__in=request_ids,
+            user__telegram_notifications_enabled=True,
+            user__telegram_chat_id__isnull=False,
+        )
+    )
+
+    for offer in offers:
+        send_telegram_message(
+            offer.user.telegram_chat_id,
+            f"⌛ Your {offer.get_type_display()} offer of {offer.amount_with_currency} "
+            f"passed its deadline and was marked as completed.",
+        )
+
+
+def _build_message(
+    listing, event: str, reservation=None, previous_status: str = "", lines=()
+) -> str:
+    if event == "expired":
+        return (
+            f"📦 Luggage listing update\n"
+            f"Listing: {listing.title}\n"
+            f"Route: {listing.departure_city} → {listing.arrival_city}\n\n"
+            f"⌛ This listing expired on {listing.available_until} and was closed."
+        )
+
     base = (
         f"📦 Luggage listing update\n"
         f"Listing: {listing.title}\n"
@@ -59,6 +251,16 @@ def _build_message(listing, event: str, reservation=None, previous_status: str =
             f"({previous_status} → {reservation.status})."
         )
 
+    if event == "waitlist_promoted" and reservation is not None:
+        return (
+            f"{base}\n\n"
+            f"🎉 Your waitlist request of {reservation.kg_requested}kg is now a pending "
+            f"reservation. Contact the seller to complete payment and handover."
+        )
+
+    if event == "reservations_updated":
+        return f"{base}\n\n" + "\n".join(lines)
+
     if event == "sold_out":
         return f"{base}\n\n✅ This listing is now sold out."
 
@@ -0,0 +1,255 @@
+import json
+import logging
+import threading
+import time
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from django.conf import settings
+from django.db import models
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_CURRENCIES = ("JPY", "UZS", "USD")
+
+# Fallback rates (units of currency per 1 USD) used until the first fetch lands.
+DEFAULT_RATES = {
+    "USD": Decimal("1"),
+    "JPY": Decimal("150"),
+    "UZS": Decimal("12700"),
+}
+
+FACTOR_PRECISION = Decimal("1e-12")
+
+_cache_lock = threading.Lock()
+_cache = {"rates": None, "loaded_at": 0.0}
+
+
+def base_currency() -> str:
+    return getattr(settings, "EXCHANGE_BASE_CURRENCY", "USD") or "USD"
+
+
+def _normalize_rates(raw: dict, base: str = "USD") -> dict:
+    """Turn a ``{currency: rate}`` mapping quoted against ``base`` into USD-quoted Decimals."""
+    rates = {}
+    for currency, value in raw.items():
+        currency = str(currency).upper()
+        if currency not in SUPPORTED_CURRENCIES:
+            continue
+        try:
+            rate = Decimal(str(value))
+        except InvalidOperation:
+            continue
+        if rate > 0:
+            rates[currency] = rate
+    rates.setdefault(base.upper(), Decimal("1"))
+
+    if base.upper() != "USD":
+        usd_rate = rates.get("USD")
+        if not usd_rate:
+            return {}
+        rates = {currency: rate / usd_rate for currency, rate in rates.items()}
+    return rates
+
+
+class StubRatesProvider:
+    """Local provider returning static rates, overridable with ``EXCHANGE_RATES_STUB``."""
+
+    name = "stub"
+
+    def fetch(self) -> dict:
+        overrides = getattr(settings, "EXCHANGE_RATES_STUB", None) or {}
+        return _normalize_rates({**DEFAULT_RATES, **overrides})
+
+
+class FileRatesProvider:
+    """Reads ``{"base": "USD", "rates": {"JPY": 150, ...}}`` from ``EXCHANGE_RATES_FILE``."""
+
+    name = "file"
+
+    def __init__(self, path: str = ""):
+        self.path = path or getattr(settings, "EXCHANGE_RATES_FILE", "") or ""
+
+    def fetch(self) -> dict:
+        if not self.path:
+            raise ValueError("EXCHANGE_RATES_FILE is not configured.")
+        payload = json.loads(Path(self.path).read_text(encoding="utf-8"))
+        return _normalize_rates(payload.get("rates") or {}, payload.get("base") or "USD")
+
+
+def get_rates_provider():
+    dotted_path = getattr(
+        settings, "EXCHANGE_RATES_PROVIDER", "exchange.rates.StubRatesProvider"
+    )
+    return import_string(dotted_path)()
+
+
+def _load_latest_rates() -> dict:
+    from exchange.models import ExchangeRate
+
+    rates = dict(DEFAULT_RATES)
+    for currency in SUPPORTED_CURRENCIES:
+        rate = (
+            ExchangeRate.objects.filter(currency=currency)
+            .order_by("-fetched_at")
+            .values_list("rate", flat=True)
+            .first()
+        )
+        if rate:
+            rates[currency] = rate
+    return rates
+
+
+def latest_rates() -> dict:
+    """Latest USD-quoted rates, held in process memory for ``EXCHANGE_RATES_TTL`` seconds."""
+    ttl = getattr(settings, "EXCHANGE_RATES_TTL", 900)
+    now = time.monotonic()
+    rates = _cache["rates"]
+    if rates is not None and now - _cache["loaded_at"] < ttl:
+        return rates
+
+    with _cache_lock:
+        if _cache["rates"] is not None and now - _cache["loaded_at"] < ttl:
+            return _cache["rates"]
+        try:
+            rates = _load_latest_rates()
+        except Exception:
+            logger.exception("Could not load exchange rates, using fallback rates")
+            rates = _cache["rates"] or dict(DEFAULT_RATES)
+        _cache["rates"] = rates
+        _cache["loaded_at"] = now
+    return rates
+
+
+def invalidate_rates_cache():
+    with _cache_lock:
+        _cache["rates"] = None
+        _cache["loaded_at"] = 0.0
+
+
+def conversion_factor(from_currency: str, to_currency: str, rates: dict | None = None) -> Decimal:
+    if from_currency == to_currency:
+        return Decimal("1")
+    rates = rates or latest_rates()
+    return rates[to_currency] / rates[from_currency]
+
+
+def convert(amount, from_currency: str, to_currency: str, rates: dict | None = None) -> Decimal:
+    return Decimal(amount) * conversion_factor(from_currency, to_currency, rates)
+
+
+def converted_expression(
+    amount_field: str,
+    currency_field: str,
+    to_currency: str,
+    rates: dict | None = None,
+    max_digits: int = 20,
+    decimal_places: int = 6,
+):
+    """Build a ``CASE`` expression converting ``amount_field`` into ``to_currency`` in SQL.
+
+    Lets a whole queryset be converted (annotated, ordered or updated) in one
+    statement with the rates snapshot inlined as literals.
+    """
+    rates = rates or latest_rates()
+    output_field = models.DecimalField(max_digits=max_digits, decimal_places=decimal_places)
+    factor_field = models.DecimalField(max_digits=30, decimal_places=12)
+    whens = [
+        models.When(
+            **{currency_field: currency},
+            then=models.ExpressionWrapper(
+                models.F(amount_field)
+                * models.Value(
+                    conversion_factor(currency, to_currency, rates).quantize(FACTOR_PRECISION),
+                    output_field=factor_field,
+                ),
+                output_field=output_field,
+            ),
+        )
+        for currency in SUPPORTED_CURRENCIES
+    ]
+    return models.Case(*whens, default=models.Value(None), output_field=output_field)
+
+
+def bank_spread() -> Decimal:
+    return Decimal(str(getattr(settings, "EXCHANGE_BANK_SPREAD", "0.03")))
+
+
+def transfer_fee(currency: str, rates: dict | None = None) -> Decimal:
+    """Typical flat remittance fee, configured in USD, expressed in ``currency``."""
+    fee_usd = Decimal(str(getattr(settings, "EXCHANGE_TRANSFER_FEE_USD", "0")))
+    return convert(fee_usd, "USD", currency, rates)
+
+
+def potential_savings(amount, currency: str, rates: dict | None = None) -> int:
+    savings = Decimal(amount) * bank_spread() + transfer_fee(currency, rates)
+    return int(savings)
+
+
+def potential_savings_expression(rates: dict | None = None):
+    rates = rates or latest_rates()
+    output_field = models.DecimalField(max_digits=20, decimal_places=2)
+    fee = models.Case(
+        *[
+            models.When(
+                currency=currency,
+                then=models.Value(
+                    transfer_fee(currency, rates).quantize(Decimal("0.01")),
+                    output_field=output_field,
+                ),
+            )
+            for currency in SUPPORTED_CURRENCIES
+        ],
+        default=models.Value(Decimal("0"), output_field=output_field),
+        output_field=output_field,
+    )
+    return models.ExpressionWrapper(
+        models.F("amount") * models.Value(bank_spread(), output_field=output_field) + fee,
+        output_field=output_field,
+    )
+
+
+def store_rates(rates: dict, source: str = ""):
+    from exchange.models import ExchangeRate
+
+    created = ExchangeRate.objects.bulk_create(
+        [
+            ExchangeRate(currency=currency, rate=rate, source=source)
+            for currency, rate in rates.items()
+            if currency in SUPPORTED_CURRENCIES
+        ]
+    )
+    invalidate_rates_cache()
+    return created
+
+
+def reprice_listings(chunk_size: int = 1000, rates: dict | None = None, queryset=None):
+    """Recompute ``price_per_kg_base`` for every listing in chunked, set-based UPDATEs.
+
+    Yields the running number of repriced rows after each chunk.
+    """
+    from exchange import cache
+    from exchange.models import LuggageListing
+
+    rates = rates or latest_rates()
+    expression = converted_expression(
+        "price_per_kg", "price_currency", base_currency(), rates
+    )
+    queryset = queryset if queryset is not None else LuggageListing.objects.all()
+    queryset = queryset.order_by("pk")
+
+    done = 0
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        pks = list(chunk.values_list("pk", flat=True)[:chunk_size])
+        if not pks:
+            break
+        done += LuggageListing.objects.filter(pk__in=pks).update(
+            price_per_kg_base=expression
+        )
+        last_pk = pks[-1]
+        # marketplace order depends on price_per_kg_base
+        cache.bump(cache.LISTINGS, cache.ALL)
+        yield done
@@ -0,0 +1,142 @@
+"""Batch status changes for a seller's reservations.
+
+``apply_status_changes`` does what ``UpdateLuggageReservationStatusView`` does
+for one reservation, for many at once: the listing row is locked once, the
+other reservations' kg are summed once, every change is checked with the
+rules of ``LuggageReservation.clean()`` against the state the batch leaves
+behind, and the rows are written with one UPDATE per target status. kg the
+batch frees goes to the listing's waitlist under the same lock. Subscribers
+get one message for the whole batch, sent after commit.
+"""
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from exchange import cache
+from exchange.models import LuggageListing, LuggageReservation
+from exchange.notifications import notify_later, notify_reservation_batch
+from exchange.waitlist import promote
+
+SELLER_STATUSES = {
+    LuggageReservation.STATUS_PENDING,
+    LuggageReservation.STATUS_RESERVED,
+    LuggageReservation.STATUS_CANCELLED,
+}
+OPEN_STATUSES = {LuggageReservation.STATUS_PENDING, LuggageReservation.STATUS_RESERVED}
+
+
+@dataclass
+class BatchResult:
+    listing: LuggageListing
+    # (reservation, previous_status) for every row whose status changed
+    changes: list = field(default_factory=list)
+    # reservations created from the waitlist with the freed kg
+    promoted: list = field(default_factory=list)
+    was_sold_out: bool = False
+    is_sold_out: bool = False
+
+
+def _open_kg(reservations) -> Decimal:
+    return sum(
+        (r.kg_requested for r in reservations if r.status in OPEN_STATUSES), Decimal("0")
+    )
+
+
+def apply_status_changes(listing_id, seller, statuses: dict) -> BatchResult:
+    """Move reservations of ``seller``'s listing to new statuses, all or nothing.
+
+    ``statuses`` maps reservation ids to a pending/reserved/cancelled status.
+    Raises ``LuggageListing.DoesNotExist`` for a listing the seller does not
+    own and ``ValidationError`` (nothing is written) when a status or
+    reservation is invalid or any change breaks a ``clean()`` rule.
+    """
+    if not statuses:
+        raise ValidationError(_("Select at least one reservation."))
+    if set(statuses.values()) - SELLER_STATUSES:
+        raise ValidationError(_("Invalid reservation status."))
+
+    with transaction.atomic():
+        listing = LuggageListing.objects.select_for_update().get(id=listing_id, seller=seller)
+        batch = list(
+            listing.reservations.select_related("buyer").filter(id__in=list(statuses))
+        )
+        if len(batch) != len(statuses):
+            raise ValidationError(_("Some reservations do not belong to this listing."))
+
+        # everything outside the batch, in one query
+        others = (
+            listing.reservations.exclude(id__in=[r.id for r in batch]).aggregate(
+                committed=Coalesce(
+                    Sum("kg_requested", filter=Q(status__in=OPEN_STATUSES)), Decimal("0")
+                ),
+                reserved=Coalesce(
+                    Sum("kg_requested", filter=Q(status=LuggageReservation.STATUS_RESERVED)),
+                    Decimal("0"),
+                ),
+            )
+        )
+
+        was_open_kg = others["committed"] + _open_kg(batch)
+        result = BatchResult(listing=listing, was_sold_out=listing.total_kg - was_open_kg <= 0)
+        for reservation in batch:
+            next_status = statuses[reservation.id]
+            if next_status != reservation.status:
+                result.changes.append((reservation, reservation.status))
+                reservation.status = next_status
+        if not result.changes:
+            result.is_sold_out = result.was_sold_out
+            return result
+
+        # clean() of each changed row, against the final state of the batch;
+        # only rows ending up open need kg, cancelling one always fits
+        open_kg = others["committed"] + _open_kg(batch)
+        for reservation, _previous in result.changes:
+            reservation.listing = listing
+            is_open = reservation.status in OPEN_STATUSES
+            try:
+                reservation.validate_capacity(
+                    (lambda: open_kg - reservation.kg_requested) if is_open else None
+                )
+            except ValidationError as exc:
+                if len(result.changes) == 1:
+                    raise
+                raise ValidationError(
+                    [f"{reservation.buyer.username}: {message}" for message in exc.messages]
+                )
+
+        now = timezone.now()
+        by_status = {}
+        for reservation, _previous in result.changes:
+            reservation.updated_at = now
+            by_status.setdefault(reservation.status, []).append(reservation.id)
+        for status, ids in by_status.items():
+            LuggageReservation.objects.filter(id__in=ids).update(status=status, updated_at=now)
+        # update() sends no signals
+        cache.bump(cache.LISTING, listing.pk)
+        cache.bump(cache.CAPACITY, listing.pk)
+
+        if open_kg < was_open_kg:
+            result.promoted = promote(listing, listing.total_kg - open_kg)
+            open_kg += sum((r.kg_requested for r in result.promoted), Decimal("0"))
+
+        listing.committed_kg_total = open_kg
+        listing.reserved_kg_total = others["reserved"] + sum(
+            (r.kg_requested for r in batch if r.status == LuggageReservation.STATUS_RESERVED),
+            Decimal("0"),
+        )
+        result.is_sold_out = listing.remaining_kg <= 0
+        notify_later(
+            notify_reservation_batch,
+            listing,
+            result.changes,
+            result.was_sold_out,
+            result.is_sold_out,
+        )
+    return result
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from exchange import cache
+from exchange.models import (
+    Conversation,
+    ConversationMembership,
+    LuggageListing,
+    LuggageReservation,
+    Message,
+    Request,
+)
+
+
+@receiver([post_save, post_delete], sender=LuggageListing)
+def listing_changed(sender, instance, **kwargs):
+    cache.bump(cache.LISTING, instance.pk)
+    cache.bump(cache.CAPACITY, instance.pk)
+
+
+@receiver([post_save, post_delete], sender=LuggageReservation)
+def reservation_changed(sender, instance, **kwargs):
+    # cached listings carry their capacity totals
+    cache.bump(cache.LISTING, instance.listing_id)
+    cache.bump(cache.CAPACITY, instance.listing_id)
+
+
+@receiver([post_save, post_delete], sender=Request)
+def offer_changed(sender, instance, **kwargs):
+    cache.bump(cache.OFFERS, cache.ALL)
+
+
+# offers show their owner's contact details
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) == {"last_login"}:
+        return
+    cache.bump(cache.OFFERS, cache.ALL)
+
+
+@receiver(post_save, sender=Conversation)
+def conversation_created(sender, instance, created, **kwargs):
+    if created:
+        ConversationMembership.objects.bulk_create(
+            [
+                ConversationMembership(conversation=instance, user_id=user_id)
+                for user_id in {instance.participant1_id, instance.participant2_id}
+            ],
+            ignore_conflicts=True,
+        )
+
+
+@receiver(post_save, sender=Message)
+def message_saved(sender, instance, **kwargs):
+    conversation = instance.conversation
+    cache.bump(cache.UNREAD, conversation.participant1_id, conversation.participant2_id)
+
+
+# Conversation rather than Message: a post_delete receiver on Message would make
+# every cascade delete load the messages one by one.
+@receiver(post_delete, sender=Conversation)
+def conversation_deleted(sender, instance, **kwargs):
+    cache.bump(cache.UNREAD, instance.participant1_id, instance.participant2_id)
@@ -1,12 +1,18 @@
 import json
 import logging
-import secrets
-from datetime import timedelta
+import re
+import uuid
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
 from urllib.error import HTTPError
 from urllib import request
 
 from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +21,12 @@ def _bot_token() -> str:
     return getattr(settings, "TELEGRAM_BOT_TOKEN", "") or ""
 
 
+def api_base_url() -> str:
+    return (
+        getattr(settings, "TELEGRAM_API_BASE_URL", "") or "https://api.telegram.org"
+    ).rstrip("/")
+
+
 def bot_configured() -> bool:
     return bool(_bot_token())
 
@@ -33,17 +45,81 @@ def bot_chat_url() -> str:
     return f"https://t.me/{bot_username}"
 
 
-def create_telegram_link_token(user):
-    from exchange.models import TelegramLinkToken
+LINK_TOKEN_TTL = timedelta(hours=12)
+_LINK_TOKEN_SALT = "exchange.telegram.link-token"
+_LINK_TOKEN_MAC_BYTES = 16
+# base64 decoding skips characters outside its alphabet, so anything but the
+# exact 48-character form is rejected before decoding
+_LINK_TOKEN_RE = re.compile(r"[A-Za-z0-9_-]{48}")
+
+
+@dataclass
+class LinkToken:
+    user_id: uuid.UUID
+    expires_at: datetime
+    # decoded payload and MAC, hex: the identity single use is tracked under
+    key: str
+
+
+def _link_token_mac(payload: bytes, secret) -> bytes:
+    mac = salted_hmac(_LINK_TOKEN_SALT, payload, secret=secret, algorithm="sha256")
+    return mac.digest()[:_LINK_TOKEN_MAC_BYTES]
+
+
+def make_link_token(user) -> str:
+    """Stateless ``/start`` token: user id, expiry and a truncated HMAC.
+
+    48 base64url characters, inside Telegram's 64-character start parameter
+    limit. Nothing is stored until the token is redeemed.
+    """
+    expires = int((timezone.now() + LINK_TOKEN_TTL).timestamp())
+    payload = user.pk.bytes + expires.to_bytes(4, "big")
+    raw = payload + _link_token_mac(payload, settings.SECRET_KEY)
+    return urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
 
-    token = secrets.token_urlsafe(24)
-    return TelegramLinkToken.objects.create(
-        user=user,
-        token=token,
-        expires_at=timezone.now() + timedelta(hours=12),
+def read_link_token(token: str):
+    """The token's user id and expiry if its signature checks out, else None."""
+    if not _LINK_TOKEN_RE.fullmatch(token):
+        return None
+    raw = urlsafe_b64decode(token)
+
+    payload, mac = raw[:20], raw[20:]
+    keys = [settings.SECRET_KEY, *getattr(settings, "SECRET_KEY_FALLBACKS", [])]
+    if not any(constant_time_compare(mac, _link_token_mac(payload, key)) for key in keys):
+        return None
+    expires = int.from_bytes(payload[16:], "big")
+    return LinkToken(
+        user_id=uuid.UUID(bytes=payload[:16]),
+        expires_at=datetime.fromtimestamp(expires, tz=dt_timezone.utc),
+        key=raw.hex(),
     )
 
 
+def redeem_link_token(link_token: LinkToken) -> bool:
+    """Record the token as used; False if it was redeemed before or has expired."""
+    # imported here: the logging config loads this module before the app registry
+    from exchange.models import RedeemedLinkToken
+
+    if link_token.expires_at <= timezone.now():
+        return False
+    try:
+        with transaction.atomic():
+            RedeemedLinkToken.objects.create(
+                key=link_token.key, expires_at=link_token.expires_at
+            )
+    except IntegrityError:
+        return False
+    return True
+
+
+def telegram_connect_url(user) -> str:
+    """Bot chat link for linked users, otherwise a /start link with a fresh token."""
+    if user.telegram_chat_id or not bot_chat_url():
+        return bot_chat_url()
+    return bot_start_url(make_link_token(user))
+
+
 def send_telegram_message(chat_id: str, text: str) -> bool:
     token = _bot_token()
     if not token or not chat_id:
@@ -58,7 +134,7 @@ def send_telegram_message(chat_id: str, text: str) -> bool:
     ).encode("utf-8")
 
     req = request.Request(
-        url=f"https://api.telegram.org/bot{token}/sendMessage",
+        url=f"{api_base_url()}/bot{token}/sendMessage",
         data=payload,
         headers={"Content-Type": "application/json"},
         method="POST",
@@ -1,3 +1,155 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from exchange.forms import LuggageWaitlistForm
+from exchange.models import LuggageListing, LuggageReservation, LuggageWaitlistEntry
+from exchange.reservations import apply_status_changes
+
+
+def make_listing(seller, **fields):
+    return LuggageListing.objects.create(
+        **{
+            "seller": seller,
+            "title": "Tashkent to Tokyo",
+            "total_kg": Decimal("10"),
+            "price_per_kg": Decimal("1000"),
+            "available_until": timezone.localdate() + timedelta(days=7),
+            "pickup_location_tokyo": "Shinjuku",
+            "allowed_items": "Clothes",
+            "prohibited_items": "Liquids",
+            **fields,
+        }
+    )
+
+
+class ApplyStatusChangesTests(TestCase):
+    def setUp(self):
+        self.seller = get_user_model().objects.create(username="seller")
+        self.listing = make_listing(self.seller)
+
+    def reserve(self, username, kg, status):
+        return LuggageReservation.objects.create(
+            listing=self.listing,
+            buyer=get_user_model().objects.create(username=username),
+            kg_requested=Decimal(kg),
+            status=status,
+        )
+
+    def test_mixed_batch_is_checked_against_final_totals(self):
+        kept = self.reserve("kept", "4", LuggageReservation.STATUS_PENDING)
+        reopened = self.reserve("reopened", "6", LuggageReservation.STATUS_CANCELLED)
+        cancelled = self.reserve("cancelled", "5", LuggageReservation.STATUS_PENDING)
+
+        result = apply_status_changes(
+            self.listing.id,
+            self.seller,
+            {
+                reopened.id: LuggageReservation.STATUS_PENDING,
+                cancelled.id: LuggageReservation.STATUS_CANCELLED,
+            },
+        )
+
+        self.assertEqual(len(result.changes), 2)
+        self.assertTrue(result.is_sold_out)
+        statuses = dict(self.listing.reservations.values_list("id", "status"))
+        self.assertEqual(statuses[kept.id], LuggageReservation.STATUS_PENDING)
+        self.assertEqual(statuses[reopened.id], LuggageReservation.STATUS_PENDING)
+        self.assertEqual(statuses[cancelled.id], LuggageReservation.STATUS_CANCELLED)
+
+    def test_batch_over_capacity_writes_nothing(self):
+        self.reserve("kept", "4", LuggageReservation.STATUS_PENDING)
+        reopened = self.reserve("reopened", "7", LuggageReservation.STATUS_CANCELLED)
+
+        with self.assertRaises(ValidationError):
+            apply_status_changes(
+                self.listing.id, self.seller, {reopened.id: LuggageReservation.STATUS_PENDING}
+            )
+
+        reopened.refresh_from_db()
+        self.assertEqual(reopened.status, LuggageReservation.STATUS_CANCELLED)
+
+
+class LuggageListingUpdateViewTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.seller = User.objects.create(username="seller")
+        self.buyer = User.objects.create(username="buyer")
+        self.client.force_login(self.seller)
+
+    def edit(self, listing, **changes):
+        data = {
+            "title": listing.title,
+            "total_kg": listing.total_kg,
+            "price_per_kg": listing.price_per_kg,
+            "price_currency": listing.price_currency,
+            "available_until": listing.available_until.isoformat(),
+            "departure_city": listing.departure_city,
+            "arrival_city": listing.arrival_city,
+            "pickup_location_tokyo": listing.pickup_location_tokyo,
+            "allowed_items": listing.allowed_items,
+            "prohibited_items": listing.prohibited_items,
+            "is_active": "on",
+            **changes,
+        }
+        return self.client.post(reverse("luggage_update", args=[listing.id]), data)
+
+    def assertPromoted(self, listing):
+        self.assertFalse(LuggageWaitlistEntry.objects.filter(listing=listing).exists())
+        self.assertTrue(
+            LuggageReservation.objects.filter(
+                listing=listing, buyer=self.buyer, status=LuggageReservation.STATUS_PENDING
+            ).exists()
+        )
+
+    def wait(self, listing):
+        LuggageWaitlistEntry.objects.create(
+            listing=listing, buyer=self.buyer, kg_requested=Decimal("3")
+        )
+
+    def test_reactivating_fills_the_waitlist(self):
+        listing = make_listing(self.seller, is_active=False)
+        self.wait(listing)
+
+        self.assertEqual(self.edit(listing).status_code, 302)
+        self.assertPromoted(listing)
+
+    def test_extending_an_expired_listing_fills_the_waitlist(self):
+        listing = make_listing(
+            self.seller, available_until=timezone.localdate() - timedelta(days=1)
+        )
+        self.wait(listing)
+
+        new_date = (timezone.localdate() + timedelta(days=7)).isoformat()
+        self.assertEqual(self.edit(listing, available_until=new_date).status_code, 302)
+        self.assertPromoted(listing)
+
+
+class LuggageWaitlistFormTests(TestCase):
+    def setUp(self):
+        self.listing = make_listing(get_user_model().objects.create(username="seller"))
+        LuggageReservation.objects.create(
+            listing=self.listing,
+            buyer=get_user_model().objects.create(username="buyer"),
+            kg_requested=Decimal("8"),
+        )
+        self.listing.refresh_from_db()
+
+    def form(self, kg):
+        return LuggageWaitlistForm({"kg_requested": kg}, listing=self.listing)
+
+    def test_rejects_more_than_the_listing_holds(self):
+        form = self.form("11")
+        self.assertFalse(form.is_valid())
+        self.assertEqual(
+            form.errors["kg_requested"], ["This listing only has 10.00 kg in total."]
+        )
 
-# Create your tests here.
+    def test_accepts_more_than_is_free(self):
+        self.assertTrue(self.form("10").is_valid())
+        self.assertFalse(self.form("2").is_valid())
@@ -32,8 +32,14 @@ urlpatterns = [
         path("<uuid:listing_id>/active/", views.ToggleLuggageListingActiveView.as_view(), name="luggage_toggle_active"),
         path("<uuid:listing_id>/", views.LuggageListingDetailView.as_view(), name="luggage_listing_detail"),
         path("<uuid:listing_id>/reserve/", views.CreateLuggageReservationView.as_view(), name="luggage_reserve"),
+        path("<uuid:listing_id>/reservations/status/", views.BulkUpdateLuggageReservationStatusView.as_view(), name="luggage_reservations_bulk_status"),
+        path("<uuid:listing_id>/waitlist/", views.JoinLuggageWaitlistView.as_view(), name="luggage_waitlist_join"),
+        path("<uuid:listing_id>/waitlist/leave/", views.LeaveLuggageWaitlistView.as_view(), name="luggage_waitlist_leave"),
         path("<uuid:listing_id>/telegram-notify/", views.ToggleLuggageTelegramSubscriptionView.as_view(), name="luggage_telegram_notify_toggle"),
         path("reservations/<uuid:reservation_id>/status/", views.UpdateLuggageReservationStatusView.as_view(), name="luggage_reservation_status"),
     ])),
+    path("api/", include("exchange.api.urls")),
+    path("export/<str:kind>/", views.ExportView.as_view(), name="export"),
+    path("telegram/connect/", views.TelegramConnectView.as_view(), name="telegram_connect"),
     path("telegram/webhook/", views.TelegramWebhookView.as_view(), name="telegram_webhook"),
 ]
@@ -1,6 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.shortcuts import redirect, get_object_or_404
-from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic.edit import ContextMixin
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
@@ -13,15 +13,18 @@ from django.views.generic import (
     CreateView,
 )
 import json
+from uuid import UUID
+from decimal import Decimal, InvalidOperation
+from django.core.paginator import Paginator
 from django.urls import reverse, reverse_lazy
 from exchange.models import (
     Conversation,
+    ConversationMembership,
     Request,
-    Message,
     LuggageListing,
     LuggageReservation,
     LuggageTelegramSubscription,
-    TelegramLinkToken,
+    LuggageWaitlistEntry,
 )
 from exchange.forms import (
     RequestForm,
@@ -29,19 +32,26 @@ from exchange.forms import (
     RequestUpdateForm,
     LuggageListingForm,
     LuggageReservationForm,
+    LuggageWaitlistForm,
+    ExportForm,
 )
 from django.contrib import messages
-from django.db import models
-from django.http import HttpRequest, JsonResponse
-from django.utils import timezone
+from django.db import models, transaction
+from django.http import Http404, HttpRequest, JsonResponse
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
+from base.http import ConditionalGetMixin
+from base.permissions import ObjectPermissionMixin
+from exchange import cache, exports, waitlist
 from exchange.notifications import notify_listing_subscribers
+from exchange.rates import base_currency
+from exchange.reservations import apply_status_changes
 from exchange.telegram import (
-    bot_start_url,
     bot_chat_url,
-    create_telegram_link_token,
+    read_link_token,
+    redeem_link_token,
     send_telegram_message,
+    telegram_connect_url,
     verify_webhook_secret,
 )
 
@@ -49,27 +59,15 @@ from exchange.telegram import (
 class BaseMixin(LoginRequiredMixin, ContextMixin):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["unread_messages"] = Message.get_unread_message_count_by_user(self.request.user)
+        context["unread_messages"] = cache.unread_count(self.request.user)
         return context
 
 
 def _build_telegram_connect_url(user) -> str:
-    if user.telegram_chat_id:
-        return bot_chat_url()
-
-    token_obj = (
-        TelegramLinkToken.objects.filter(
-            user=user,
-            used_at__isnull=True,
-            expires_at__gte=timezone.now(),
-        )
-        .order_by("-created_at")
-        .first()
-    )
-    if not token_obj:
-        token_obj = create_telegram_link_token(user)
-
-    return bot_start_url(token_obj.token) or bot_chat_url()
+    # link tokens are only issued when the user follows this URL (TelegramConnectView)
+    if not bot_chat_url():
+        return ""
+    return reverse("telegram_connect")
 
 
 class CreateOfferView(BaseMixin, CreateView):
@@ -91,11 +89,12 @@ class CreateOfferView(BaseMixin, CreateView):
         return context
 
 
-class UpdateOfferView(BaseMixin, UserPassesTestMixin, UpdateView):
+class UpdateOfferView(BaseMixin, ObjectPermissionMixin, UpdateView):
     model = Request
     form_class = RequestUpdateForm  # Use the specific update form class
     template_name = "exchange/offer_form.html"
     pk_url_kwarg = "request_id"
+    owner_fields = ("user",)
     success_url = reverse_lazy("my_offers")
 
     def get_context_data(self, **kwargs):
@@ -108,68 +107,83 @@ class UpdateOfferView(BaseMixin, UserPassesTestMixin, UpdateView):
         messages.success(self.request, _("Offer updated successfully"))
         return super().form_valid(form)
 
-    def test_func(self):
-        req = self.get_object()
-        return req.user == self.request.user
-
 
-class CompleteRequestView(LoginRequiredMixin, UserPassesTestMixin, RedirectView):
+class CompleteRequestView(LoginRequiredMixin, ObjectPermissionMixin, RedirectView):
+    model = Request
+    pk_url_kwarg = "request_id"
+    owner_fields = ("user",)
     permanent = False
 
     def get_redirect_url(self, *args, **kwargs):
-        req = get_object_or_404(
-            Request, id=kwargs["request_id"], user=self.request.user
-        )
+        req = self.get_object()
         if req.status == "active":
             req.status = "completed"
             req.save()
             messages.success(self.request, _("Offer completed successfully"))
         return reverse("my_offers")
 
-    def test_func(self):
-        # Check if the user is the owner of the request
-        req = get_object_or_404(Request, id=self.kwargs["request_id"])
-        return req.user == self.request.user
-
 
-class DeleteRequestView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class DeleteRequestView(LoginRequiredMixin, ObjectPermissionMixin, DeleteView):
     model = Request
     success_url = reverse_lazy("my_offers")
     pk_url_kwarg = "request_id"
+    owner_fields = ("user",)
 
     def form_valid(self, form):
         messages.success(self.request, _("Offer deleted successfully"))
         return super().form_valid(form)
 
-    def test_func(self):
-        # Check if the user is the owner of the request
-        return self.get_object().user == self.request.user
-
 
 class MyRequestsView(BaseMixin, TemplateView):
     template_name = "exchange/my_offers.html"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["requests"] = Request.objects.filter(user=self.request.user).order_by(
-            "-created_at"
+        context["requests"] = (
+            Request.objects.filter(user=self.request.user)
+            .with_potential_savings()
+            .order_by("-created_at")
         )
         return context
 
 
-class LuggageMarketplaceView(TemplateView):
+class LuggageMarketplaceView(ConditionalGetMixin, TemplateView):
     template_name = "exchange/luggage_marketplace.html"
+    use_read_replica = True
+    sort_options = {
+        "newest": ["-created_at"],
+        "price": ["price_per_kg_base"],
+        "-price": ["-price_per_kg_base"],
+    }
+
+    def get_version(self):
+        return (cache.version(cache.LISTINGS, cache.ALL),)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["listings"] = LuggageListing.objects.filter(is_active=True).select_related(
-            "seller"
-        )
-        context["unread_messages"] = (
-            Message.get_unread_message_count_by_user(self.request.user)
-            if self.request.user.is_authenticated
-            else 0
+        sort = self.request.GET.get("sort", "newest")
+        if sort not in self.sort_options:
+            sort = "newest"
+        listings = (
+            LuggageListing.objects.filter(is_active=True).select_related("seller").with_capacity()
         )
+
+        price_range = {}
+        for param, lookup in (("price_min", "gte"), ("price_max", "lte")):
+            try:
+                value = Decimal(self.request.GET.get(param, ""))
+            except InvalidOperation:
+                continue
+            if value.is_finite():
+                price_range[f"price_per_kg_base__{lookup}"] = value
+                context[param] = value
+        if price_range:
+            listings = listings.filter(**price_range)
+
+        context["listings"] = listings.order_by(*self.sort_options[sort])
+        context["sort"] = sort
+        context["base_currency"] = base_currency()
+        context["unread_messages"] = cache.unread_count(self.request.user)
         return context
 
 
@@ -188,40 +202,44 @@ class LuggageListingCreateView(LoginRequiredMixin, CreateView):
         context = super().get_context_data(**kwargs)
         context["view_title"] = _("Create Luggage Storage Listing")
         context["submit_button_text"] = _("Publish Listing")
-        context["unread_messages"] = Message.get_unread_message_count_by_user(
-            self.request.user
-        )
+        context["unread_messages"] = cache.unread_count(self.request.user)
         return context
 
 
-class LuggageListingUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class LuggageListingUpdateView(LoginRequiredMixin, ObjectPermissionMixin, UpdateView):
     template_name = "exchange/luggage_listing_form.html"
     model = LuggageListing
     form_class = LuggageListingForm
     pk_url_kwarg = "listing_id"
+    owner_fields = ("seller",)
     success_url = reverse_lazy("luggage_my_listings")
 
-    def test_func(self):
-        return self.get_object().seller == self.request.user
-
     def form_valid(self, form):
+        with transaction.atomic():
+            previous = LuggageListing.objects.select_for_update().get(pk=self.object.pk)
+            response = super().form_valid(form)
+            listing = self.object
+            # more kg, or reactivated / extended: the waitlist may fit now
+            reopened = (previous.is_expired or not previous.is_active) and (
+                listing.is_active and not listing.is_expired
+            )
+            if listing.total_kg > previous.total_kg or reopened:
+                waitlist.fill(listing)
         messages.success(self.request, _("Luggage listing updated."))
-        return super().form_valid(form)
+        return response
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["view_title"] = _("Edit Luggage Storage Listing")
         context["submit_button_text"] = _("Save Changes")
-        context["unread_messages"] = Message.get_unread_message_count_by_user(
-            self.request.user
-        )
+        context["unread_messages"] = cache.unread_count(self.request.user)
         return context
 
 
 class DeleteLuggageListingView(LoginRequiredMixin, View):
     def post(self, request: HttpRequest, *args, **kwargs):
         listing = get_object_or_404(LuggageListing, id=kwargs["listing_id"])
-        if listing.seller != request.user:
+        if listing.seller_id != request.user.pk:
             messages.error(request, _("You are not allowed to delete this listing."))
             return redirect("luggage_listing_detail", listing_id=listing.id)
 
@@ -233,7 +251,7 @@ class DeleteLuggageListingView(LoginRequiredMixin, View):
 class ToggleLuggageListingActiveView(LoginRequiredMixin, View):
     def post(self, request: HttpRequest, *args, **kwargs):
         listing = get_object_or_404(LuggageListing, id=kwargs["listing_id"])
-        if listing.seller != request.user:
+        if listing.seller_id != request.user.pk:
             messages.error(request, _("You are not allowed to update this listing."))
             return redirect("luggage_listing_detail", listing_id=listing.id)
 
@@ -249,6 +267,9 @@ class ToggleLuggageListingActiveView(LoginRequiredMixin, View):
             return redirect("luggage_listing_detail", listing_id=listing.id)
 
         listing.save(update_fields=["is_active", "updated_at"])
+        if listing.is_active:
+            with transaction.atomic():
+                waitlist.fill(LuggageListing.objects.select_for_update().get(pk=listing.pk))
 
         next_url = request.POST.get("next")
         if next_url == "my_listings":
@@ -263,36 +284,70 @@ class MyLuggageListingsView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         context["listings"] = (
             LuggageListing.objects.filter(seller=self.request.user)
-            .prefetch_related("reservations__buyer")
+            .with_capacity()
+            .prefetch_related(
+                models.Prefetch(
+                    "reservations",
+                    queryset=LuggageReservation.objects.select_related("buyer").order_by(
+                        "-created_at"
+                    ),
+                )
+            )
             .order_by("-created_at")
         )
-        context["unread_messages"] = Message.get_unread_message_count_by_user(
-            self.request.user
-        )
+        context["reservation_statuses"] = LuggageReservation.STATUS_CHOICES
+        context["unread_messages"] = cache.unread_count(self.request.user)
         return context
 
 
-class LuggageListingDetailView(TemplateView):
+class LuggageListingDetailView(ConditionalGetMixin, TemplateView):
     template_name = "exchange/luggage_listing_detail.html"
+    use_read_replica = True
+    reservations_per_page = 20
+
+    def get_version(self):
+        listing_id = self.kwargs["listing_id"]
+        return (
+            cache.version(cache.LISTING, listing_id),
+            cache.version(cache.CAPACITY, listing_id),
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        listing = get_object_or_404(LuggageListing, id=self.kwargs["listing_id"])
+        # cached with seller and capacity totals; the listing costs no query on a hit
+        listing = cache.get_listing(self.kwargs["listing_id"])
+        if listing is None:
+            raise Http404
+        user = self.request.user
+        is_seller = user.is_authenticated and user.pk == listing.seller_id
+
         context["listing"] = listing
-        context["reservations"] = listing.reservations.select_related("buyer")
-        context["reservation_form"] = LuggageReservationForm(listing=listing)
-        if self.request.user.is_authenticated:
+        context["listing_version"] = cache.version(cache.LISTING, listing.pk)
+        context["viewer_role"] = (
+            "seller" if is_seller else "member" if user.is_authenticated else "anonymous"
+        )
+        if is_seller:
+            context["reservations"] = Paginator(
+                listing.reservations.select_related("buyer").order_by("-created_at"),
+                self.reservations_per_page,
+            ).get_page(self.request.GET.get("reservations_page"))
+        else:
+            context["reservation_form"] = LuggageReservationForm(listing=listing)
+        if user.is_authenticated and not is_seller and listing.is_active and not listing.is_expired:
+            # only sold out listings offer the waitlist, so open ones skip the query
+            entry = None
+            if listing.remaining_kg <= 0:
+                entry = LuggageWaitlistEntry.objects.filter(listing=listing, buyer=user).first()
+                context["waitlist_form"] = LuggageWaitlistForm(instance=entry, listing=listing)
+            context["waitlist_entry"] = entry
+        if user.is_authenticated:
             context["telegram_subscription"] = LuggageTelegramSubscription.objects.filter(
                 listing=listing,
-                user=self.request.user,
+                user=user,
             ).first()
-            context["telegram_is_linked"] = bool(self.request.user.telegram_chat_id)
-            context["telegram_link_url"] = _build_telegram_connect_url(self.request.user)
-        context["unread_messages"] = (
-            Message.get_unread_message_count_by_user(self.request.user)
-            if self.request.user.is_authenticated
-            else 0
-        )
+            context["telegram_is_linked"] = bool(user.telegram_chat_id)
+            context["telegram_link_url"] = _build_telegram_connect_url(user)
+        context["unread_messages"] = cache.unread_count(user)
         return context
 
 
@@ -303,6 +358,7 @@ class ToggleLuggageTelegramSubscriptionView(LoginRequiredMixin, View):
         if not request.user.telegram_chat_id:
             link_url = _build_telegram_connect_url(request.user)
             if link_url:
+                link_url = request.build_absolute_uri(link_url)
                 messages.info(
                     request,
                     _("First connect Telegram: open %(url)s from this account, then return here.")
@@ -363,9 +419,7 @@ class LuggageNotificationsView(LoginRequiredMixin, TemplateView):
         )
         context["telegram_is_linked"] = bool(self.request.user.telegram_chat_id)
         context["telegram_link_url"] = _build_telegram_connect_url(self.request.user)
-        context["unread_messages"] = Message.get_unread_message_count_by_user(
-            self.request.user
-        )
+        context["unread_messages"] = cache.unread_count(self.request.user)
         return context
 
 
@@ -443,55 +497,146 @@ class CreateLuggageReservationView(LoginRequiredMixin, View):
         return redirect("luggage_listing_detail", listing_id=listing.id)
 
 
+class JoinLuggageWaitlistView(LoginRequiredMixin, View):
+    def post(self, request: HttpRequest, *args, **kwargs):
+        listing = get_object_or_404(LuggageListing, id=kwargs["listing_id"])
+
+        if listing.seller == request.user:
+            messages.error(request, _("You cannot reserve your own listing."))
+            return redirect("luggage_listing_detail", listing_id=listing.id)
+        if listing.is_expired or not listing.is_active:
+            messages.error(request, _("This listing is no longer available."))
+            return redirect("luggage_listing_detail", listing_id=listing.id)
+
+        entry = LuggageWaitlistEntry.objects.filter(listing=listing, buyer=request.user).first()
+        form = LuggageWaitlistForm(request.POST, instance=entry, listing=listing)
+        if form.is_valid():
+            entry = form.save(commit=False)
+            entry.listing = listing
+            entry.buyer = request.user
+            entry.save()
+            messages.success(
+                request,
+                _("You are on the waitlist. We will reserve the space for you when it frees up."),
+            )
+        else:
+            for field_errors in form.errors.values():
+                for error in field_errors:
+                    messages.error(request, error)
+        return redirect("luggage_listing_detail", listing_id=listing.id)
+
+
+class LeaveLuggageWaitlistView(LoginRequiredMixin, View):
+    def post(self, request: HttpRequest, *args, **kwargs):
+        LuggageWaitlistEntry.objects.filter(
+            listing_id=kwargs["listing_id"], buyer=request.user
+        ).delete()
+        messages.success(request, _("You left the waitlist."))
+        return redirect("luggage_listing_detail", listing_id=kwargs["listing_id"])
+
+
 class UpdateLuggageReservationStatusView(LoginRequiredMixin, View):
     def post(self, request: HttpRequest, *args, **kwargs):
-        reservation = get_object_or_404(LuggageReservation, id=kwargs["reservation_id"])
+        reservation = get_object_or_404(
+            LuggageReservation.objects.select_related("listing"), id=kwargs["reservation_id"]
+        )
         listing = reservation.listing
-        was_sold_out = listing.remaining_kg <= 0
-        previous_status = reservation.status
 
         if listing.seller != request.user:
             messages.error(request, _("You are not allowed to update this reservation."))
             return redirect("luggage_listing_detail", listing_id=listing.id)
 
-        next_status = request.POST.get("status")
-        allowed_statuses = {
-            LuggageReservation.STATUS_PENDING,
-            LuggageReservation.STATUS_RESERVED,
-            LuggageReservation.STATUS_CANCELLED,
-        }
-        if next_status not in allowed_statuses:
-            messages.error(request, _("Invalid reservation status."))
-            return redirect("luggage_listing_detail", listing_id=listing.id)
-
-        reservation.status = next_status
+        # a batch of one: same lock, capacity rules, waitlist promotion and notifications
         try:
-            reservation.clean()
-            reservation.save(update_fields=["status", "updated_at"])
-            listing.refresh_from_db()
-            notify_listing_subscribers(
-                listing,
-                event="reservation_status_changed",
-                reservation=reservation,
-                previous_status=previous_status,
+            apply_status_changes(
+                listing.id, request.user, {reservation.id: request.POST.get("status")}
             )
-            is_sold_out = listing.remaining_kg <= 0
-            if not was_sold_out and is_sold_out:
-                notify_listing_subscribers(listing, event="sold_out")
-            if was_sold_out and not is_sold_out:
-                notify_listing_subscribers(listing, event="reopened")
             messages.success(request, _("Reservation status updated."))
         except ValidationError as exc:
-            if hasattr(exc, "message_dict"):
-                for field_name, errors in exc.message_dict.items():
-                    for error in errors:
-                        messages.error(request, error)
-            else:
-                for error in exc.messages:
-                    messages.error(request, error)
+            for error in exc.messages:
+                messages.error(request, error)
         return redirect("luggage_listing_detail", listing_id=listing.id)
 
 
+class BulkUpdateLuggageReservationStatusView(LoginRequiredMixin, View):
+    """Apply one status to the selected reservations of a listing in one go."""
+
+    def post(self, request: HttpRequest, *args, **kwargs):
+        try:
+            reservation_ids = [UUID(value) for value in request.POST.getlist("reservations")]
+        except ValueError:
+            messages.error(request, _("Invalid reservation selection."))
+            return redirect("luggage_my_listings")
+
+        next_status = request.POST.get("status")
+        try:
+            result = apply_status_changes(
+                kwargs["listing_id"],
+                request.user,
+                {reservation_id: next_status for reservation_id in reservation_ids},
+            )
+        except LuggageListing.DoesNotExist:
+            raise Http404
+        except ValidationError as exc:
+            for error in exc.messages:
+                messages.error(request, error)
+        else:
+            messages.success(
+                request,
+                _("%(count)s reservation(s) updated.") % {"count": len(result.changes)},
+            )
+        return redirect("luggage_my_listings")
+
+
+class ExportView(LoginRequiredMixin, View):
+    """Stream the user's own reservations (on their listings), listings or offers."""
+
+    owner_lookups = {
+        "reservations": "listing__seller",
+        "listings": "seller",
+        "offers": "user",
+    }
+
+    def get(self, request: HttpRequest, *args, **kwargs):
+        kind = kwargs["kind"]
+        if kind not in self.owner_lookups:
+            raise Http404
+        export = exports.EXPORTS[kind]
+
+        form = ExportForm(request.GET, statuses=export.statuses)
+        if not form.is_valid():
+            for field_errors in form.errors.values():
+                for error in field_errors:
+                    messages.error(request, error)
+            return redirect("my_offers" if kind == "offers" else "luggage_my_listings")
+
+        queryset = export.model.objects.filter(**{self.owner_lookups[kind]: request.user})
+        if kind == "reservations" and form.cleaned_data["listing"]:
+            queryset = queryset.filter(listing_id=form.cleaned_data["listing"])
+        queryset = exports.apply_filters(
+            queryset,
+            kind,
+            created_from=form.cleaned_data["created_from"],
+            created_to=form.cleaned_data["created_to"],
+            status=form.cleaned_data["status"],
+        )
+        return exports.export_response(queryset, form.cleaned_data["format"] or "csv")
+
+
+class TelegramConnectView(LoginRequiredMixin, View):
+    """Send the user to the bot, issuing a link token only now that it is needed."""
+
+    def get(self, request: HttpRequest, *args, **kwargs):
+        url = telegram_connect_url(request.user)
+        if not url:
+            messages.error(
+                request,
+                _("Telegram bot username is not configured by admin yet."),
+            )
+            return redirect("luggage_notifications")
+        return redirect(url)
+
+
 @method_decorator(csrf_exempt, name="dispatch")
 class TelegramWebhookView(View):
     def post(self, request: HttpRequest, *args, **kwargs):
@@ -518,24 +663,28 @@ class TelegramWebhookView(View):
             start_token = parts[1].strip() if len(parts) > 1 else ""
 
             if start_token:
-                token_obj = TelegramLinkToken.objects.select_related("user").filter(
-                    token=start_token
-                ).first()
-                if not token_obj:
+                link_token = read_link_token(start_token)
+                if not link_token:
                     send_telegram_message(
                         str(chat_id),
                         "Invalid or unknown connect token. Please click Connect Telegram again from the website.",
                     )
                     return JsonResponse({"ok": True})
 
-                if not token_obj.is_valid:
+                if not redeem_link_token(link_token):
                     send_telegram_message(
                         str(chat_id),
                         "This connect token is expired or already used. Please generate a new one from the website.",
                     )
                     return JsonResponse({"ok": True})
 
-                user = token_obj.user
+                user = get_user_model().objects.filter(pk=link_token.user_id).first()
+                if not user:
+                    send_telegram_message(
+                        str(chat_id),
+                        "Invalid or unknown connect token. Please click Connect Telegram again from the website.",
+                    )
+                    return JsonResponse({"ok": True})
 
                 get_user_model().objects.filter(telegram_chat_id=str(chat_id)).exclude(
                     pk=user.pk
@@ -555,8 +704,6 @@ class TelegramWebhookView(View):
                         "telegram_linked_at",
                     ]
                 )
-                token_obj.used_at = timezone.now()
-                token_obj.save(update_fields=["used_at"])
 
                 send_telegram_message(
                     str(chat_id),
@@ -687,28 +834,17 @@ class TelegramWebhookView(View):
 class StartConversationView(LoginRequiredMixin, View):
     def get(self, request: HttpRequest, request_id, *args, **kwargs):
         req = get_object_or_404(Request, id=request_id)
-        if self.request.user == req.user:
+        if request.user.pk == req.user_id:
             return redirect("home")
 
-        conversation = (
-            Conversation.objects.filter(
-                request=req, participant1=self.request.user, participant2=req.user
-            ).first()
-            or Conversation.objects.filter(
-                request=req, participant1=req.user, participant2=req.user
-            ).first()
-        )
-
-        if not conversation:
-            conversation = Conversation.objects.create(
-                request=req, participant1=self.request.user, participant2=req.user
-            )
+        conversation, _created = Conversation.get_or_start(req, request.user.pk, req.user_id)
 
         return redirect("conversation", conversation_id=conversation.id)
 
 
 class ConversationsListView(BaseMixin, TemplateView):
     template_name = "exchange/conversations_list.html"
+    use_read_replica = True
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -718,27 +854,52 @@ class ConversationsListView(BaseMixin, TemplateView):
         return context
 
 
-class ConversationView(BaseMixin, UserPassesTestMixin, TemplateView):
+class ConversationView(BaseMixin, ObjectPermissionMixin, TemplateView):
     template_name = "exchange/conversation.html"
+    model = Conversation
+    pk_url_kwarg = "conversation_id"
+    owner_fields = ("participant1", "participant2")
+
+    def get_queryset(self):
+        # just what the chat header shows, in the query that checks access
+        return Conversation.objects.select_related(
+            "participant1", "participant2", "request__user"
+        ).only(
+            "participant1__username",
+            "participant2__username",
+            "request__type",
+            "request__amount",
+            "request__currency",
+            "request__status",
+            "request__user__username",
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        conversation = Conversation.objects.get(id=self.kwargs["conversation_id"])
-        messages = conversation.messages.all()
-        messages.filter(~models.Q(sender=self.request.user)).update(is_read=True)
+        conversation = self.get_object()
+        user = self.request.user
+        chat_messages = list(conversation.messages.select_related("sender"))
+        # one UPDATE of the user's membership row, however many were unread
+        if chat_messages and ConversationMembership.mark_read(
+            conversation, user, max(message.id for message in chat_messages)
+        ):
+            cache.bump(cache.UNREAD, user.pk)
 
         context["conversation"] = conversation
-        context["conversations"] = Conversation.get_user_conversations(
-            self.request.user
+        context["conversations"] = Conversation.get_user_conversations(user)
+        context["chat_messages"] = chat_messages
+        # the other participant has read the messages up to this id
+        context["read_up_to"] = (
+            conversation.memberships.exclude(user=user)
+            .values_list("last_read_message_id", flat=True)
+            .first()
+            or 0
         )
-        context["chat_messages"] = messages
         context["form"] = MessageForm()
         return context
 
     def post(self, request: HttpRequest, *args, **kwargs):
-        conversation = get_object_or_404(
-            Conversation, id=self.kwargs["conversation_id"]
-        )
+        conversation = self.get_object()
         form = MessageForm(request.POST)
         if form.is_valid():
             message = form.save(commit=False)
@@ -747,31 +908,23 @@ class ConversationView(BaseMixin, UserPassesTestMixin, TemplateView):
             message.save()
         return redirect("conversation", conversation_id=conversation.id)
 
-    def test_func(self):
-        """Check if the user is a participant in the conversation"""
-        conversation = get_object_or_404(
-            Conversation, id=self.kwargs["conversation_id"]
-        )
-        return self.request.user in [
-            conversation.participant1,
-            conversation.participant2,
-        ]
-
 
 class DeleteConversationView(LoginRequiredMixin, View):
     def post(self, request: HttpRequest, *args, **kwargs):
         try:
-            conversation = Conversation.objects.get(id=self.kwargs["conversation_id"])
+            conversation = Conversation.objects.only(
+                "participant1_id", "participant2_id"
+            ).get(id=self.kwargs["conversation_id"])
         except Conversation.DoesNotExist:
             return JsonResponse(
                 {"error": "Conversation not found."},
                 status=404,
             )
         # Check if the user is a participant in the conversation
-        if request.user not in [
-            conversation.participant1,
-            conversation.participant2,
-        ]:
+        if request.user.pk not in (
+            conversation.participant1_id,
+            conversation.participant2_id,
+        ):
             return JsonResponse(
                 {"error": "You are not authorized to delete this conversation."},
                 status=403,
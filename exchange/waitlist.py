@@ -0,0 +1,72 @@
+"""Promote waitlisted buyers into pending reservations when kg frees up.
+
+Callers hold the listing's row lock (``select_for_update``) for the whole
+promotion, so the free kg they pass in cannot change underneath it. The queue
+is walked oldest first in keyset-paginated chunks, and only entries that still
+fit are fetched: a 30kg request at the head does not keep a 2kg request
+behind it waiting (greedy first fit). Buyers are notified after commit, off
+the request thread.
+"""
+
+from decimal import Decimal
+
+from django.db.models import Q
+
+from exchange import cache
+from exchange.models import LuggageReservation, LuggageWaitlistEntry
+from exchange.notifications import notify_later, notify_waitlist_promoted
+
+CHUNK_SIZE = 500
+
+
+def promote(listing, free_kg: Decimal) -> list:
+    """Create pending reservations for the entries that fit into ``free_kg``."""
+    if free_kg <= 0 or not listing.is_active or listing.is_expired:
+        return []
+
+    promoted = []
+    last = None
+    while free_kg > 0:
+        queue = LuggageWaitlistEntry.objects.filter(
+            listing=listing, kg_requested__lte=free_kg
+        ).order_by("created_at", "id")
+        if last is not None:
+            queue = queue.filter(
+                Q(created_at__gt=last.created_at) | Q(created_at=last.created_at, id__gt=last.id)
+            )
+        chunk = list(queue[:CHUNK_SIZE])
+        for entry in chunk:
+            if entry.kg_requested <= free_kg:
+                promoted.append(entry)
+                free_kg -= entry.kg_requested
+                if free_kg <= 0:
+                    break
+        if len(chunk) < CHUNK_SIZE:
+            break
+        last = chunk[-1]
+
+    if not promoted:
+        return []
+
+    reservations = LuggageReservation.objects.bulk_create(
+        LuggageReservation(
+            listing=listing,
+            buyer_id=entry.buyer_id,
+            kg_requested=entry.kg_requested,
+            contact_handle=entry.contact_handle,
+            note=entry.note,
+        )
+        for entry in promoted
+    )
+    LuggageWaitlistEntry.objects.filter(id__in=[entry.id for entry in promoted]).delete()
+    # bulk_create sends no post_save
+    cache.bump(cache.LISTING, listing.pk)
+    cache.bump(cache.CAPACITY, listing.pk)
+    notify_later(notify_waitlist_promoted, listing.pk, [r.id for r in reservations])
+    return reservations
+
+
+def fill(listing) -> list:
+    """Promote into whatever kg the listing has free (one aggregate query)."""
+    totals = listing.capacity_totals()
+    return promote(listing, listing.total_kg - totals["committed_kg_total"])
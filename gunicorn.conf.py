@@ -0,0 +1,5 @@
+# Loaded automatically by gunicorn from the working directory. GUNICORN_THREADS
+# is also read by base/settings.py to size the database connection pool.
+import os
+
+threads = int(os.getenv("GUNICORN_THREADS", "1"))
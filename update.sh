@@ -2,6 +2,10 @@ git pull origin main
 uv sync
 uv run manage.py collectstatic --noinput
 uv run manage.py migrate
+# read pointers must exist before the new code counts unread messages
+uv run manage.py backfill_read_pointers
 sudo systemctl restart exchange_hub
 sudo systemctl daemon-reload
-sudo systemctl restart exchange_hub.socket exchange_hub.service
\ No newline at end of file
+sudo systemctl restart exchange_hub.socket exchange_hub.service
+# again for conversations the old workers created during the deploy
+uv run manage.py backfill_read_pointers